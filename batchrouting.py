@@ -0,0 +1,115 @@
+"""
+Many-to-many routing: distance matrices between sets of map nodes.
+
+Instead of one astar search per (source, target) pair, each source runs a
+single Dijkstra sweep that stops once every target is settled.  Sources
+can be spread over a pool of worker processes, which read the graph from
+shared memory instead of each holding a copy:
+
+    matrix, _ = distance_matrix(graph, depots, stops, edge_distance, workers=8)
+"""
+
+import heapq
+from csrgraph import CSRGraph, shared_arrays, attach_worker, worker_arrays
+
+INFINITY = float("inf")
+
+def one_to_many(offsets, targets, weights, source, goals, want_parents=False):
+    """
+    Runs Dijkstra's algorithm from source until every goal is settled.
+
+    inputs:
+        - offsets, targets, weights: the edge arrays of a CSRGraph (or
+          memoryviews of them)
+        - source: the id of the node to start from
+        - goals: a list of node ids to find distances to
+        - want_parents: if True, also return the shortest path tree
+
+    Returns: a tuple (distances, parents): a list with the distance to
+    each goal (infinity if unreachable) and, if requested, a dictionary
+    mapping the id of every settled node to the id of its parent (-1 for
+    source), else None.
+    """
+    dist = {source: 0.0}
+    parent = {source: -1}
+    settled = set()
+    remaining = set(goals)
+    heap = [(0.0, source)]
+    while heap and remaining:
+        node_dist, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        remaining.discard(node)
+        for pos in range(offsets[node], offsets[node + 1]):
+            target = targets[pos]
+            new_dist = node_dist + weights[pos]
+            if new_dist < dist.get(target, INFINITY):
+                dist[target] = new_dist
+                parent[target] = node
+                heapq.heappush(heap, (new_dist, target))
+
+    distances = [dist[goal] if goal in settled else INFINITY for goal in goals]
+    if not want_parents:
+        return distances, None
+    return distances, {node: parent[node] for node in settled}
+
+def _route_in_worker(source, goals, want_parents):
+    """
+    Runs one_to_many in a worker process on the shared graph arrays.
+    """
+    views = worker_arrays()
+    return one_to_many(views["offsets"], views["targets"], views["weights"],
+                       source, goals, want_parents)
+
+def distance_matrix(graph, sources, targets, edge_distance, workers=None,
+                    parents=False):
+    """
+    Computes the shortest path distance from every source to every target.
+
+    inputs:
+        - graph: a directed Graph object representing a street map, or a
+          CSRGraph with edge distances
+        - sources: a list of nodes in graph to route from
+        - targets: a list of nodes in graph to route to
+        - edge_distance: a function which takes two nodes and a graph
+          and returns the actual distance between two neighboring nodes;
+          ignored if graph is already a CSRGraph
+        - workers: the number of worker processes, or None to route in
+          this process
+        - parents: if True, also return a shortest path tree per source
+
+    Returns: a tuple (matrix, trees): matrix[i][j] is the distance from
+    sources[i] to targets[j] (infinity if unreachable), and trees is
+    either None or a list with, for each source, a dictionary associating
+    each node settled by its search with its parent node.
+    """
+    if isinstance(graph, CSRGraph):
+        csr = graph
+    else:
+        csr = CSRGraph.from_graph(graph, edge_distance)
+    source_ids = [csr.node_id(node) for node in sources]
+    goal_ids = [csr.node_id(node) for node in targets]
+
+    if not workers:
+        results = [one_to_many(csr.offsets, csr.targets, csr.weights,
+                               source, goal_ids, parents)
+                   for source in source_ids]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with shared_arrays({"offsets": csr.offsets, "targets": csr.targets,
+                            "weights": csr.weights}) as spec:
+            with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker,
+                                     initargs=(spec,)) as executor:
+                futures = [executor.submit(_route_in_worker, source, goal_ids, parents)
+                           for source in source_ids]
+                results = [future.result() for future in futures]
+
+    matrix = [distances for distances, _ in results]
+    if not parents:
+        return matrix, None
+    trees = []
+    for _, tree in results:
+        trees.append({csr.node_name(node): (csr.node_name(previous) if previous >= 0 else None)
+                      for node, previous in tree.items()})
+    return matrix, trees
@@ -0,0 +1,439 @@
+"""
+A cache of breadth-first search trees for the Kevin Bacon Game.
+
+Trivia queries keep asking for paths from the same few actors, so the
+shortest path tree of each source is computed once and kept, keyed by
+(graph version, source), as compact arrays of node ids:
+
+    cache = BFSCache(maxsize=32, directory="bfs-cache")
+    path = cache.find_path(graph, "Kevin Bacon", "Tina Fey", version="2024-06")
+
+The version names the state of the graph; use a new version whenever
+the graph changes, or tell the cache about added edges with add_edges,
+which repairs the cached trees in place.  With a directory, trees are
+also saved to disk and reloaded by later processes.
+"""
+
+import collections
+import hashlib
+import heapq
+import json
+import os
+from array import array
+from csrgraph import save_arrays, load_arrays
+
+def _from_json(node):
+    """
+    Returns: node as read back from JSON, with lists turned back into the
+    tuples they were saved from.
+    """
+    return tuple(node) if isinstance(node, list) else node
+
+class _NodeTable:
+    """
+    The integer ids of the nodes of one graph version.
+    """
+
+    def __init__(self, names):
+        """
+        Numbers the given nodes 0..len(names)-1.
+        """
+        self.names = list(names)
+        self.ids = {name: idx for idx, name in enumerate(self.names)}
+
+    def intern(self, name):
+        """
+        Returns: the id of name, giving it a new id if it has none.
+        """
+        idx = self.ids.get(name)
+        if idx is None:
+            idx = len(self.names)
+            self.names.append(name)
+            self.ids[name] = idx
+        return idx
+
+class BFSTree:
+    """
+    The distances and parents found by one breadth-first search, stored
+    as arrays indexed by node id (-1 for unreachable nodes).
+    """
+
+    def __init__(self, source, dist, parent):
+        """
+        Creates a new BFSTree.
+
+        inputs:
+            - source: the id of the node the search started from
+            - dist: an array('i') of distances from source
+            - parent: an array('i') of parent ids
+        """
+        self.source = source
+        self.dist = dist
+        self.parent = parent
+        self.histogram = None
+
+    def grow(self, num_nodes):
+        """
+        Extends the arrays with unreachable entries up to num_nodes nodes.
+        """
+        missing = num_nodes - len(self.dist)
+        if missing > 0:
+            self.dist.extend(array('i', [-1]) * missing)
+            self.parent.extend(array('i', [-1]) * missing)
+            if self.histogram is not None:
+                self._count(float("inf"), missing)
+
+    def _count(self, distance, change):
+        """
+        Adds change to the histogram count of distance.
+        """
+        count = self.histogram.get(distance, 0) + change
+        if count:
+            self.histogram[distance] = count
+        else:
+            del self.histogram[distance]
+
+    def distance_histogram(self):
+        """
+        Returns: a dictionary mapping each distance with the number of
+        nodes that are that distance from source, like
+        kevinbacongame.distance_histogram.  It is computed once and then
+        kept up to date by repair.
+        """
+        if self.histogram is None:
+            counts = collections.Counter(self.dist)
+            unreachable = counts.pop(-1, 0)
+            self.histogram = dict(counts)
+            if unreachable:
+                self.histogram[float("inf")] = unreachable
+        return self.histogram
+
+    def repair(self, graph, table, edges):
+        """
+        Updates the tree after edges were added to graph.  Adding edges
+        can only shorten distances, so only the nodes reached sooner
+        through a new edge, and the nodes below them, are searched again.
+
+        inputs:
+            - graph: the graph with the edges already added
+            - table: the _NodeTable of graph
+            - edges: a list of (node1, node2) id pairs of the new edges
+
+        Returns: True if any distance changed, False otherwise.
+        """
+        dist = self.dist
+        parent = self.parent
+        names = table.names
+        ids = table.ids
+        changed = False
+        heap = []
+
+        def relax(node, neighbor):
+            nonlocal changed
+            old = dist[neighbor]
+            new = dist[node] + 1
+            if old < 0 or new < old:
+                if self.histogram is not None:
+                    self._count(old if old >= 0 else float("inf"), -1)
+                    self._count(new, 1)
+                dist[neighbor] = new
+                parent[neighbor] = node
+                heapq.heappush(heap, (new, neighbor))
+                changed = True
+
+        for node, neighbor in edges:
+            if dist[node] >= 0:
+                relax(node, neighbor)
+#Search again from the improved nodes, closest first, through every edge
+        while heap:
+            node_dist, node = heapq.heappop(heap)
+            if node_dist != dist[node]:
+                continue
+            for neighbor in graph.get_neighbors(names[node]):
+                relax(node, ids[neighbor])
+        return changed
+
+def _search(graph, table, source):
+    """
+    Runs a breadth-first search on graph from the node with id source.
+
+    Returns: a new BFSTree.
+    """
+    names = table.names
+    ids = table.ids
+    dist = array('i', [-1]) * len(names)
+    parent = array('i', [-1]) * len(names)
+    dist[source] = 0
+    frontier = [source]
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for node in frontier:
+            for neighbor in graph.get_neighbors(names[node]):
+                idx = ids[neighbor]
+                if dist[idx] < 0:
+                    dist[idx] = level
+                    parent[idx] = node
+                    next_frontier.append(idx)
+        frontier = next_frontier
+    return BFSTree(source, dist, parent)
+
+class BFSCache:
+    """
+    A size-bounded LRU cache of breadth-first search trees.
+    """
+
+    def __init__(self, maxsize=128, directory=None):
+        """
+        Creates an empty cache.
+
+        inputs:
+            - maxsize: the number of trees kept in memory
+            - directory: an optional directory in which trees are saved;
+              versions and nodes must then be JSON-serializable
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self._tables = {}
+        self._trees = collections.OrderedDict()
+
+    def _version_dir(self, version):
+        """
+        Returns: the directory holding the saved trees of version.
+        """
+        digest = hashlib.sha1(json.dumps(version).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def _table(self, graph, version):
+        """
+        Returns: the _NodeTable of version, loading or building it on
+        first use.
+        """
+        table = self._tables.get(version)
+        if table is None:
+            path = None
+            if self.directory is not None:
+                path = os.path.join(self._version_dir(version), "nodes.json")
+            if path is not None and os.path.exists(path):
+                with open(path) as infile:
+                    table = _NodeTable(_from_json(name) for name in json.load(infile))
+            else:
+                table = _NodeTable(graph.nodes())
+                self._save_table(version, table)
+            self._tables[version] = table
+        return table
+
+    def _save_table(self, version, table):
+        """
+        Writes the node table of version to disk, if there is a directory.
+        """
+        if self.directory is not None:
+            path = os.path.join(self._version_dir(version), "nodes.json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as outfile:
+                json.dump(table.names, outfile)
+
+    def _tree_path(self, version, source):
+        """
+        Returns: the file name of the saved tree of source in version.
+        """
+        digest = hashlib.sha1(json.dumps(source).encode("utf-8")).hexdigest()
+        return os.path.join(self._version_dir(version), digest + ".bfs")
+
+    def _save_tree(self, version, source, tree):
+        """
+        Writes a tree to disk.
+        """
+        save_arrays(self._tree_path(version, source), {"source": source},
+                    {"dist": tree.dist, "parent": tree.parent})
+
+    def _store(self, key, tree):
+        """
+        Adds a tree to the in-memory cache, evicting the least recently
+        used tree if the cache is full.
+        """
+        self._trees[key] = tree
+        self._trees.move_to_end(key)
+        while len(self._trees) > self.maxsize:
+            self._trees.popitem(last=False)
+
+    def tree(self, graph, source, version=None):
+        """
+        Returns the breadth-first search tree of source, computing it (or
+        loading it from disk) only if it is not cached.
+
+        inputs:
+            - graph: a graph object
+            - source: a node in graph
+            - version: a hashable value naming the state of graph
+
+        Returns: a BFSTree.
+        """
+        key = (version, source)
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            return tree
+
+        table = self._table(graph, version)
+        path = None
+        if self.directory is not None:
+            path = self._tree_path(version, source)
+        if path is not None and os.path.exists(path):
+            _, arrays = load_arrays(path)
+            tree = BFSTree(table.ids[source], arrays["dist"], arrays["parent"])
+        else:
+            tree = _search(graph, table, table.ids[source])
+            if path is not None:
+                self._save_tree(version, source, tree)
+        tree.grow(len(table.names))
+        self._store(key, tree)
+        return tree
+
+    def distance(self, graph, source, node, version=None):
+        """
+        Returns: the distance from source to node, or infinity if node
+        cannot be reached.
+        """
+        tree = self.tree(graph, source, version)
+        dist = tree.dist[self._tables[version].ids[node]]
+        return dist if dist >= 0 else float("inf")
+
+    def path_nodes(self, graph, start_node, end_node, version=None):
+        """
+        Finds a shortest path by following the cached parents, which takes
+        time proportional to the length of the path.
+
+        Returns: a list of the nodes from start_node to end_node, or an
+        empty list if end_node cannot be reached.
+        """
+        tree = self.tree(graph, start_node, version)
+        table = self._tables[version]
+        node = table.ids[end_node]
+        if tree.dist[node] < 0:
+            return []
+        path = []
+        while node >= 0:
+            path.append(table.names[node])
+            node = tree.parent[node]
+        path.reverse()
+        return path
+
+    def find_path(self, graph, start_person, end_person, version=None):
+        """
+        Computes the path from start_person to end_person in the graph,
+        like kevinbacongame.find_path, using the cached tree of
+        start_person.
+
+        returns a list of tuples of the path in the form:
+            [(actor1, {movie1a, ...}), (actor2, {movie2a, ...}), ...]
+        """
+        nodes = self.path_nodes(graph, start_person, end_person, version)
+        if not nodes:
+            return []
+        path = [(actor, graph.get_attrs(actor, next_actor))
+                for actor, next_actor in zip(nodes, nodes[1:])]
+        path.append((end_person, set()))
+        return path
+
+    def distance_histogram(self, graph, source, version=None):
+        """
+        Returns: a dictionary mapping each distance with the number of
+        nodes that are that distance from source, like
+        kevinbacongame.distance_histogram, using the cached tree.
+        """
+        return dict(self.tree(graph, source, version).distance_histogram())
+
+    def add_edges(self, graph, edges, version=None, new_version=None):
+        """
+        Repairs the cached trees of version after edges were added to
+        graph, instead of searching again from scratch.  With a
+        directory, trees of version saved on disk are repaired too.  The
+        edges connect people both ways, like the edges of the actor graph.
+
+        inputs:
+            - graph: the graph with the edges already added
+            - edges: a list of (node1, node2) pairs of the new edges; nodes
+              not in the graph before are added to the cache
+            - version: the version the cached trees belong to
+            - new_version: the version of the updated graph, under which
+              the repaired trees are cached; if None, they keep version
+
+        Returns: a list of the sources of the cached trees whose distance
+        histograms changed.  Only histograms that were already computed
+        are compared.
+        """
+        if self.directory is not None:
+            #Trees of version may be saved on disk even if none is loaded
+            table = self._table(graph, version)
+        else:
+            table = self._tables.get(version)
+            if table is None:
+                #No tree of version was ever computed, so none can be stale
+                return []
+        if new_version is None:
+            new_version = version
+        elif new_version != version:
+            table = _NodeTable(table.names)
+            self._tables[new_version] = table
+
+        pairs = []
+        for node1, node2 in edges:
+            idx1 = table.intern(node1)
+            idx2 = table.intern(node2)
+            pairs.append((idx1, idx2))
+            pairs.append((idx2, idx1))
+
+        changed = []
+        repaired = set()
+        trees = collections.OrderedDict()
+        for (tree_version, source), tree in self._trees.items():
+            if tree_version == version:
+                before = dict(tree.histogram) if tree.histogram is not None else None
+                tree.grow(len(table.names))
+                tree.repair(graph, table, pairs)
+                if before is not None and tree.histogram != before:
+                    changed.append(source)
+                repaired.add(source)
+                tree_version = new_version
+            trees[(tree_version, source)] = tree
+        self._trees = trees
+
+        if self.directory is not None:
+            self._save_table(new_version, table)
+            for source in repaired:
+                self._save_tree(new_version, source, self._trees[(new_version, source)])
+            if new_version == version:
+                self._repair_saved(graph, version, table, pairs, repaired)
+        return changed
+
+    def _repair_saved(self, graph, version, table, pairs, repaired):
+        """
+        Repairs the trees of version that are saved on disk but were not
+        in memory, so that tree() never loads them out of date.
+
+        inputs:
+            - graph: the graph with the edges already added
+            - version: the version of the saved trees
+            - table: the _NodeTable of version
+            - pairs: the (node1, node2) id pairs of the new edges
+            - repaired: the sources of the trees already repaired
+        """
+        kept = {os.path.basename(self._tree_path(version, source))
+                for source in repaired}
+        directory = self._version_dir(version)
+        for name in os.listdir(directory):
+            if name.endswith(".bfs") and name not in kept:
+                header, arrays = load_arrays(os.path.join(directory, name))
+                source = _from_json(header["source"])
+                tree = BFSTree(table.ids[source], arrays["dist"], arrays["parent"])
+                tree.grow(len(table.names))
+                tree.repair(graph, table, pairs)
+                self._save_tree(version, source, tree)
+
+    def clear(self):
+        """
+        Removes all trees from memory.  Saved trees stay on disk.
+        """
+        self._trees.clear()
@@ -3,7 +3,6 @@ Code to calculate the circle that passes through three given points.
 """
 
 import math
-import comp140_module1 as circles
 
 def distance(point0x, point0y, point1x, point1y):
     """
@@ -121,6 +120,12 @@ def make_circle(point0x, point0y, point1x, point1y, point2x, point2y):
     
     return xcenter, ycenter, radius
 
-# Run GUI - uncomment the line below after you have
-#           implemented make_circle
-circles.start(make_circle)
+def run():
+    """
+    Start the GUI that draws the circle through three points.
+    """
+    import comp140_module1 as circles
+    circles.start(make_circle)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,354 @@
+"""
+Contraction hierarchies for repeated point-to-point routing on a fixed map.
+
+Preprocessing contracts the nodes of the street map one at a time, in
+order of importance, adding shortcut edges that preserve shortest path
+distances between the remaining nodes.  A query then runs a small
+bidirectional Dijkstra search that only moves up the hierarchy:
+
+    hierarchy = ContractionHierarchy.build(graph, edge_distance)
+    hierarchy.save("city.ch")
+    ...
+    hierarchy = ContractionHierarchy.load("city.ch")
+    parent = hierarchy.query(start, end)
+
+query returns a parent dictionary for the nodes of the shortest path,
+in the same form as mapsearch.astar.
+"""
+
+import heapq
+import itertools
+from array import array
+from csrgraph import CSRGraph, save_arrays, load_arrays
+
+INFINITY = float("inf")
+
+def _witness_distances(out_edges, contracted, source, skip, max_dist, max_settled):
+    """
+    Runs a bounded Dijkstra search among the uncontracted nodes, used to
+    decide whether a shortcut is needed.
+
+    inputs:
+        - out_edges: a list of dictionaries mapping neighbor ids to distances
+        - contracted: a bytearray marking the contracted nodes
+        - source: the node id to start from
+        - skip: the node id being contracted, which may not be used
+        - max_dist: the search stops beyond this distance
+        - max_settled: the search stops after settling this many nodes
+
+    Returns: a dictionary mapping node ids to (upper bounds on) their
+    distance from source.
+    """
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    settled = 0
+    while heap and settled < max_settled:
+        node_dist, node = heapq.heappop(heap)
+        if node_dist > dist[node]:
+            continue
+        if node_dist > max_dist:
+            break
+        settled += 1
+        for target, weight in out_edges[node].items():
+            if target == skip or contracted[target]:
+                continue
+            new_dist = node_dist + weight
+            if new_dist < dist.get(target, INFINITY):
+                dist[target] = new_dist
+                heapq.heappush(heap, (new_dist, target))
+    return dist
+
+def _needed_shortcuts(node, out_edges, in_edges, contracted, max_settled):
+    """
+    Finds the shortcuts that contracting node would require.
+
+    Returns: a list of (source, target, distance) triples, one for every
+    pair of uncontracted neighbors whose shortest path runs through node.
+    """
+    shortcuts = []
+    targets = [(target, weight) for target, weight in out_edges[node].items()
+               if not contracted[target]]
+    if not targets:
+        return shortcuts
+    max_out = max(weight for _, weight in targets)
+    for source, in_weight in in_edges[node].items():
+        if contracted[source]:
+            continue
+        witness = _witness_distances(out_edges, contracted, source, node,
+                                     in_weight + max_out, max_settled)
+        for target, out_weight in targets:
+            if target == source:
+                continue
+            via = in_weight + out_weight
+            if witness.get(target, INFINITY) > via:
+                shortcuts.append((source, target, via))
+    return shortcuts
+
+def _pack(csr_lists):
+    """
+    Packs per-node lists of (neighbor, distance, middle) triples into flat
+    offset, neighbor, distance and middle-node arrays.
+    """
+    offsets = array('q', [0])
+    targets = array('i')
+    weights = array('d')
+    middles = array('i')
+    for edges in csr_lists:
+        for target, weight, middle in edges:
+            targets.append(target)
+            weights.append(weight)
+            middles.append(middle)
+        offsets.append(len(targets))
+    return offsets, targets, weights, middles
+
+class ContractionHierarchy:
+    """
+    A preprocessed street map that answers shortest path queries by
+    searching upward in a node hierarchy.
+    """
+
+    def __init__(self, names, upward, downward):
+        """
+        Creates a new ContractionHierarchy from its arrays.  Use build or
+        load to create one.
+
+        inputs:
+            - names: a list of the nodes, indexed by node id
+            - upward: a tuple (offsets, targets, weights, middles) of the
+              edges from each node to higher ranked nodes; middles holds
+              the node a shortcut bypasses, or -1 for original edges
+            - downward: the same for the edges into each node from higher
+              ranked nodes, with targets holding the edge sources
+        """
+        self._names = names
+        self._ids = {name: idx for idx, name in enumerate(names)}
+        self._upward = upward
+        self._downward = downward
+
+    @classmethod
+    def build(cls, graph, edge_distance, max_settled=64):
+        """
+        Runs the preprocessing for a graph.
+
+        Nodes are contracted in order of edge difference (shortcuts added
+        minus edges removed) plus the number of contracted neighbors,
+        with priorities updated lazily.
+
+        inputs:
+            - graph: a directed Graph object representing a street map
+            - edge_distance: a function which takes two nodes and a graph
+              and returns the actual distance between two neighboring nodes
+            - max_settled: the number of nodes each witness search may
+              settle; smaller values preprocess faster but add more shortcuts
+
+        Returns: a new ContractionHierarchy for graph.
+        """
+        csr = CSRGraph.from_graph(graph, edge_distance)
+        num_nodes = len(csr)
+        out_edges = [{} for _ in range(num_nodes)]
+        in_edges = [{} for _ in range(num_nodes)]
+        middle = {}
+        for source in range(num_nodes):
+            for pos in range(csr.offsets[source], csr.offsets[source + 1]):
+                target = csr.targets[pos]
+                weight = csr.weights[pos]
+                if target != source and weight < out_edges[source].get(target, INFINITY):
+                    out_edges[source][target] = weight
+                    in_edges[target][source] = weight
+
+        contracted = bytearray(num_nodes)
+        contracted_neighbors = [0] * num_nodes
+
+        def priority(node):
+            """
+            Returns: the contraction priority of node; lower goes first.
+            """
+            added = len(_needed_shortcuts(node, out_edges, in_edges,
+                                          contracted, max_settled))
+            removed = len(out_edges[node]) + len(in_edges[node])
+            return added - removed + contracted_neighbors[node]
+
+        order = itertools.count()
+        heap = [(priority(node), next(order), node) for node in range(num_nodes)]
+        heapq.heapify(heap)
+        upward = [None] * num_nodes
+        downward = [None] * num_nodes
+
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            #Lazy update: if the priority has grown past the next
+            #candidate, put the node back instead of contracting it
+            current = priority(node)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, next(order), node))
+                continue
+
+            for source, target, via in _needed_shortcuts(node, out_edges, in_edges,
+                                                         contracted, max_settled):
+                if via < out_edges[source].get(target, INFINITY):
+                    out_edges[source][target] = via
+                    in_edges[target][source] = via
+                    middle[(source, target)] = node
+
+            #The remaining edges of node all lead to higher ranked nodes
+            upward[node] = [(target, weight, middle.get((node, target), -1))
+                            for target, weight in out_edges[node].items()
+                            if not contracted[target]]
+            downward[node] = [(source, weight, middle.get((source, node), -1))
+                              for source, weight in in_edges[node].items()
+                              if not contracted[source]]
+            contracted[node] = 1
+            for target, _, _ in upward[node]:
+                contracted_neighbors[target] += 1
+            for source, _, _ in downward[node]:
+                contracted_neighbors[source] += 1
+
+        return cls(csr.nodes(), _pack(upward), _pack(downward))
+
+    def save(self, path):
+        """
+        Writes the hierarchy to a file.  The nodes must be JSON-serializable.
+
+        inputs:
+            - path: the name of the file to write
+        """
+        arrays = {}
+        for prefix, edges in (("up", self._upward), ("down", self._downward)):
+            for name, values in zip(("offsets", "targets", "weights", "middles"), edges):
+                arrays[prefix + "_" + name] = values
+        save_arrays(path, {"names": self._names}, arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a hierarchy written by save.
+
+        inputs:
+            - path: the name of the file to read
+
+        Returns: a new ContractionHierarchy.
+        """
+        header, arrays = load_arrays(path)
+        names = [tuple(name) if isinstance(name, list) else name
+                 for name in header["names"]]
+        edges = []
+        for prefix in ("up", "down"):
+            edges.append(tuple(arrays[prefix + "_" + name] for name
+                               in ("offsets", "targets", "weights", "middles")))
+        return cls(names, edges[0], edges[1])
+
+    def _search(self, start, end):
+        """
+        Runs the bidirectional upward search between two node ids.
+
+        Returns: a tuple (distance, meeting node, forward parents,
+        backward parents), where the parents map node ids to the id of
+        the previous node on the search tree; the meeting node is -1 if
+        end cannot be reached.
+        """
+        searches = ((self._upward, {start: 0.0}, {start: -1}, [(0.0, start)]),
+                    (self._downward, {end: 0.0}, {end: -1}, [(0.0, end)]))
+        best = INFINITY
+        meeting = -1
+        done = [False, False]
+        while not all(done):
+            for side, (edges, dist, parent, heap) in enumerate(searches):
+                if done[side]:
+                    continue
+                #A direction is finished once its closest open node is
+                #already farther away than the best path found
+                while heap and heap[0][0] > dist[heap[0][1]]:
+                    heapq.heappop(heap)
+                if not heap or heap[0][0] >= best:
+                    done[side] = True
+                    continue
+                node_dist, node = heapq.heappop(heap)
+                other_dist = searches[1 - side][1].get(node)
+                if other_dist is not None and node_dist + other_dist < best:
+                    best = node_dist + other_dist
+                    meeting = node
+                offsets, targets, weights, _ = edges
+                for pos in range(offsets[node], offsets[node + 1]):
+                    target = targets[pos]
+                    new_dist = node_dist + weights[pos]
+                    if new_dist < dist.get(target, INFINITY):
+                        dist[target] = new_dist
+                        parent[target] = node
+                        heapq.heappush(heap, (new_dist, target))
+        return best, meeting, searches[0][2], searches[1][2]
+
+    def _middle(self, source, target):
+        """
+        Returns: the node bypassed by the hierarchy edge from source to
+        target, or -1 if it is an original edge.
+        """
+        offsets, targets, _, middles = self._upward
+        for pos in range(offsets[source], offsets[source + 1]):
+            if targets[pos] == target:
+                return middles[pos]
+        offsets, targets, _, middles = self._downward
+        for pos in range(offsets[target], offsets[target + 1]):
+            if targets[pos] == source:
+                return middles[pos]
+        raise KeyError((source, target))
+
+    def route(self, start_node, end_node):
+        """
+        Finds a shortest path between two nodes.
+
+        inputs:
+            - start_node: a node in the graph representing the start
+            - end_node: a node in the graph representing the end
+
+        Returns: a tuple (distance, path), where path is the list of nodes
+        from start_node to end_node, or (infinity, []) if end_node cannot
+        be reached.
+        """
+        start = self._ids[start_node]
+        end = self._ids[end_node]
+        distance, meeting, forward, backward = self._search(start, end)
+        if meeting < 0:
+            return INFINITY, []
+
+        hops = []
+        node = meeting
+        while node != -1:
+            hops.append(node)
+            node = forward[node]
+        hops.reverse()
+        node = backward[meeting]
+        while node != -1:
+            hops.append(node)
+            node = backward[node]
+
+        #Replace each shortcut by the two edges it bypasses
+        path = [hops[0]]
+        for source, target in zip(hops, hops[1:]):
+            stack = [(source, target)]
+            while stack:
+                edge_source, edge_target = stack.pop()
+                middle = self._middle(edge_source, edge_target)
+                if middle < 0:
+                    path.append(edge_target)
+                else:
+                    stack.append((middle, edge_target))
+                    stack.append((edge_source, middle))
+        return distance, [self._names[node] for node in path]
+
+    def query(self, start_node, end_node):
+        """
+        Finds a shortest path between two nodes.
+
+        inputs:
+            - start_node: a node in the graph representing the start
+            - end_node: a node in the graph representing the end
+
+        Returns: a dictionary associating each node on the path with its
+        parent node, like mapsearch.astar; it only contains start_node
+        if end_node cannot be reached.
+        """
+        _, path = self.route(start_node, end_node)
+        parent = {start_node: None}
+        for previous, node in zip(path, path[1:]):
+            parent[node] = previous
+        return parent
@@ -0,0 +1,497 @@
+"""
+Compressed sparse row (CSR) graphs for the search workloads.
+
+A CSRGraph numbers the nodes of a graph 0..n-1 and stores the edges in
+flat arrays: the neighbors of node i are targets[offsets[i]:offsets[i+1]],
+and weights holds the matching edge distances.  It also provides the
+nodes/get_neighbors/get_attrs interface of the course graph objects.
+Given a CSRGraph, the searches in mapsearch and kevinbacongame work on
+node ids and these arrays, and only name the nodes in their results.
+
+Node attributes such as coordinates are not copied, so heuristics like
+straight_line_distance should still look them up in the original graph.
+"""
+
+import contextlib
+import heapq
+import json
+import sys
+from array import array
+
+class CSRGraph:
+    """
+    A read-only directed graph in compressed sparse row form.
+    """
+
+    def __init__(self, names, offsets, targets, weights=None, attrs=None):
+        """
+        Creates a new CSRGraph from its arrays.  Use from_graph to convert
+        an existing graph.
+
+        inputs:
+            - names: a list of the nodes, indexed by node id
+            - offsets: an array of len(names) + 1 integers; the edges of
+              node i are at positions offsets[i] up to offsets[i+1]
+            - targets: an array of node ids, the head of each edge
+            - weights: an optional array of floats, the distance of each edge
+            - attrs: an optional list with the attributes of each edge
+        """
+        self._names = names
+        self._ids = {name: idx for idx, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._attrs = attrs
+        self._edge_positions = None
+
+    @classmethod
+    def from_graph(cls, graph, edge_distance=None, keep_attrs=False):
+        """
+        Converts a graph with nodes() and get_neighbors(node) methods.
+
+        inputs:
+            - graph: a graph object
+            - edge_distance: an optional function which takes two nodes and
+              a graph and returns the distance of the edge between them
+            - keep_attrs: if True, store graph.get_attrs(node1, node2) for
+              every edge
+
+        Returns: a new CSRGraph with the same nodes and edges.
+        """
+        names = list(graph.nodes())
+        ids = {name: idx for idx, name in enumerate(names)}
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d') if edge_distance is not None else None
+        attrs = [] if keep_attrs else None
+
+        for node in names:
+            for neighbor in graph.get_neighbors(node):
+                targets.append(ids[neighbor])
+                if weights is not None:
+                    weights.append(edge_distance(node, neighbor, graph))
+                if attrs is not None:
+                    attrs.append(graph.get_attrs(node, neighbor))
+            offsets.append(len(targets))
+        return cls(names, offsets, targets, weights, attrs)
+
+    def __len__(self):
+        """
+        Returns: the number of nodes in the graph.
+        """
+        return len(self._names)
+
+    def num_edges(self):
+        """
+        Returns: the number of directed edges in the graph.
+        """
+        return len(self.targets)
+
+    def node_id(self, node):
+        """
+        Returns: the integer id of the given node.
+        """
+        return self._ids[node]
+
+    def node_name(self, node_id):
+        """
+        Returns: the node with the given integer id.
+        """
+        return self._names[node_id]
+
+    def has_node(self, node):
+        """
+        Returns: True if node is in the graph, False otherwise.
+        """
+        return node in self._ids
+
+    def nodes(self):
+        """
+        Returns: a list of all nodes, in node id order.
+        """
+        return list(self._names)
+
+    def get_neighbors(self, node):
+        """
+        Returns: a list of the nodes at the end of the edges leaving node.
+        """
+        idx = self._ids[node]
+        names = self._names
+        return [names[target] for target
+                in self.targets[self.offsets[idx]:self.offsets[idx + 1]]]
+
+    def neighbor_ids(self, node_id):
+        """
+        Returns: an array of the ids of the neighbors of the node with the
+        given id.
+        """
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def _edge_index(self, node1, node2):
+        """
+        Returns: the position of the edge from node1 to node2 in the edge
+        arrays.  Raises KeyError if there is no such edge.
+        """
+        positions = self._edge_positions
+        if positions is not None:
+            return positions[self._ids[node1] * len(self._names) + self._ids[node2]]
+        idx1 = self._ids[node1]
+        idx2 = self._ids[node2]
+        targets = self.targets
+        for pos in range(self.offsets[idx1], self.offsets[idx1 + 1]):
+            if targets[pos] == idx2:
+                return pos
+        raise KeyError((node1, node2))
+
+    def _index_edges(self):
+        """
+        Returns: a dictionary mapping id1 * len(self) + id2 to the position
+        of the edge from id1 to id2, built on first use, so that edges of
+        high-degree nodes are found without scanning their rows.
+        """
+        if self._edge_positions is None:
+            num_nodes = len(self._names)
+            offsets = self.offsets
+            targets = self.targets
+            positions = {}
+            for node in range(num_nodes):
+                base = node * num_nodes
+                for pos in range(offsets[node], offsets[node + 1]):
+                    positions.setdefault(base + targets[pos], pos)
+            self._edge_positions = positions
+        return self._edge_positions
+
+    def get_attrs(self, node1, node2):
+        """
+        Returns: the attributes of the edge from node1 to node2, as stored
+        by from_graph with keep_attrs.
+        """
+        if self._attrs is None:
+            raise ValueError("graph was converted without edge attributes")
+        return self._attrs[self._edge_index(node1, node2)]
+
+    def path_attrs(self, path):
+        """
+        Returns: a list with the attributes of each edge along path, a
+        list of nodes, looked up in an index of all edges.
+        """
+        if self._attrs is None:
+            raise ValueError("graph was converted without edge attributes")
+        positions = self._index_edges()
+        num_nodes = len(self._names)
+        ids = [self._ids[node] for node in path]
+        attrs = self._attrs
+        try:
+            return [attrs[positions[idx1 * num_nodes + idx2]]
+                    for idx1, idx2 in zip(ids, ids[1:])]
+        except KeyError:
+            missing = next((node1, node2) for node1, node2 in zip(path, path[1:])
+                           if self._ids[node1] * num_nodes + self._ids[node2] not in positions)
+            raise KeyError(missing) from None
+
+    def edge_distance(self, node1, node2, graph=None):
+        """
+        Looks up the stored distance of the edge from node1 to node2.  The
+        signature matches the edge_distance function taken by
+        mapsearch.astar.
+
+        Returns: a float edge distance.
+        """
+        if self.weights is None:
+            raise ValueError("graph was converted without edge distances")
+        return self.weights[self._edge_index(node1, node2)]
+
+    def reverse(self):
+        """
+        Returns: a new CSRGraph with the same nodes and ids, in which every
+        edge points the other way.  Edge distances and attributes are kept.
+        """
+        num_nodes = len(self._names)
+        counts = array('q', bytes(8 * (num_nodes + 1)))
+        for target in self.targets:
+            counts[target + 1] += 1
+        for idx in range(num_nodes):
+            counts[idx + 1] += counts[idx]
+        offsets = array('q', counts)
+
+        #Place each edge at the next free position of its new source
+        targets = array('i', bytes(4 * len(self.targets)))
+        weights = None
+        if self.weights is not None:
+            weights = array('d', bytes(8 * len(self.targets)))
+        attrs = [None] * len(self.targets) if self._attrs is not None else None
+        for source in range(num_nodes):
+            for pos in range(self.offsets[source], self.offsets[source + 1]):
+                target = self.targets[pos]
+                new_pos = counts[target]
+                counts[target] += 1
+                targets[new_pos] = source
+                if weights is not None:
+                    weights[new_pos] = self.weights[pos]
+                if attrs is not None:
+                    attrs[new_pos] = self._attrs[pos]
+        return CSRGraph(self._names, offsets, targets, weights, attrs)
+
+    def to_numpy(self):
+        """
+        Returns: a tuple (offsets, targets, weights) of numpy arrays that
+        share memory with this graph; weights is None if the graph has no
+        edge distances.  Requires numpy.
+        """
+        import numpy
+        weights = None
+        if self.weights is not None:
+            weights = numpy.frombuffer(self.weights, dtype=numpy.float64)
+        return (numpy.frombuffer(self.offsets, dtype=numpy.int64),
+                numpy.frombuffer(self.targets, dtype=numpy.int32),
+                weights)
+
+
+def shortest_path_tree(csr, source):
+    """
+    Runs Dijkstra's algorithm over the edge distances of a CSRGraph.
+
+    inputs:
+        - csr: a CSRGraph with edge distances
+        - source: the id of the node to start from
+
+    Returns: a tuple (dist, parent) of arrays indexed by node id: the
+    distance from source (infinity if unreachable) and the id of the
+    parent in the shortest path tree (-1 for source and unreachable nodes).
+    """
+    num_nodes = len(csr)
+    offsets = csr.offsets
+    targets = csr.targets
+    weights = csr.weights
+    dist = array('d', [float("inf")]) * num_nodes
+    parent = array('i', [-1]) * num_nodes
+    done = bytearray(num_nodes)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        node_dist, node = heapq.heappop(heap)
+        if done[node]:
+            continue
+        done[node] = 1
+        for pos in range(offsets[node], offsets[node + 1]):
+            target = targets[pos]
+            new_dist = node_dist + weights[pos]
+            if new_dist < dist[target]:
+                dist[target] = new_dist
+                parent[target] = node
+                heapq.heappush(heap, (new_dist, target))
+    return dist, parent
+
+def level_sizes(offsets, targets, source):
+    """
+    Runs a breadth-first search over CSR edge arrays and counts the nodes
+    at each distance from source.
+
+    inputs:
+        - offsets, targets: the edge arrays of a CSRGraph (or memoryviews
+          of them)
+        - source: the id of the node to start from
+
+    Returns: a list whose entry d is the number of nodes at distance d
+    from source; nodes not in the list are unreachable.
+    """
+    visited = bytearray(len(offsets) - 1)
+    visited[source] = 1
+    frontier = [source]
+    sizes = []
+    while frontier:
+        sizes.append(len(frontier))
+        next_frontier = []
+        for node in frontier:
+            for pos in range(offsets[node], offsets[node + 1]):
+                target = targets[pos]
+                if not visited[target]:
+                    visited[target] = 1
+                    next_frontier.append(target)
+        frontier = next_frontier
+    return sizes
+
+# Array contents start at multiples of this many bytes in saved files, so
+# that map_arrays can view them in place.
+_ALIGNMENT = 8
+
+def _padding(nbytes):
+    """
+    Returns: the number of bytes needed to extend nbytes to a multiple of
+    _ALIGNMENT.
+    """
+    return -nbytes % _ALIGNMENT
+
+def save_arrays(path, header, arrays):
+    """
+    Writes arrays to a compact binary file: one line of JSON describing
+    the arrays, followed by their raw contents, each padded to start at
+    a multiple of 8 bytes.
+
+    inputs:
+        - path: the name of the file to write
+        - header: a JSON-serializable dictionary stored with the arrays
+        - arrays: a dictionary mapping names to array.array objects
+    """
+    layout = [[name, values.typecode, len(values)] for name, values in arrays.items()]
+    line = json.dumps({"header": header, "arrays": layout,
+                       "byteorder": sys.byteorder, "aligned": True}).encode("utf-8")
+    line += b" " * _padding(len(line) + 1) + b"\n"
+    with open(path, "wb") as outfile:
+        outfile.write(line)
+        for values in arrays.values():
+            values.tofile(outfile)
+            outfile.write(bytes(_padding(len(values) * values.itemsize)))
+
+def load_arrays(path):
+    """
+    Reads a file written by save_arrays.
+
+    inputs:
+        - path: the name of the file to read
+
+    Returns: a tuple (header, arrays) with the stored header dictionary
+    and a dictionary mapping names to array.array objects.
+    """
+    with open(path, "rb") as infile:
+        description = json.loads(infile.readline().decode("utf-8"))
+        arrays = {}
+        for name, typecode, length in description["arrays"]:
+            values = array(typecode)
+            values.fromfile(infile, length)
+            if description.get("aligned"):
+                infile.read(_padding(length * values.itemsize))
+            if description["byteorder"] != sys.byteorder:
+                values.byteswap()
+            arrays[name] = values
+    return description["header"], arrays
+
+def map_arrays(path):
+    """
+    Memory-maps a file written by save_arrays instead of reading it, so
+    that opening it is fast and every process that maps the same file
+    shares one copy of it in the page cache.
+
+    inputs:
+        - path: the name of the file to map
+
+    Returns: a tuple (header, mapping, views) with the stored header
+    dictionary, the mmap object, which must stay open while the views
+    are used, and a dictionary mapping names to read-only memoryviews
+    indexed like the arrays.
+    """
+    import mmap
+    with open(path, "rb") as infile:
+        description = json.loads(infile.readline().decode("utf-8"))
+        position = infile.tell()
+        if not description.get("aligned"):
+            raise ValueError("file was written without aligned arrays")
+        if description["byteorder"] != sys.byteorder:
+            raise ValueError("file was written with a different byte order")
+        mapping = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = memoryview(mapping)
+    views = {}
+    for name, typecode, length in description["arrays"]:
+        nbytes = length * array(typecode).itemsize
+        views[name] = buffer[position:position + nbytes].cast(typecode)
+        position += nbytes + _padding(nbytes)
+    return description["header"], mapping, views
+
+def share_arrays(arrays):
+    """
+    Copies arrays into shared memory blocks so that worker processes can
+    read them without their own copy.
+
+    inputs:
+        - arrays: a dictionary mapping names to array.array objects
+
+    Returns: a tuple (blocks, spec): the SharedMemory blocks, which the
+    caller must close and unlink when done, and a picklable description
+    to pass to attach_arrays in the workers.
+    """
+    from multiprocessing import shared_memory
+    blocks = []
+    spec = {}
+    for name, values in arrays.items():
+        nbytes = len(values) * values.itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        block.buf[:nbytes] = memoryview(values).cast('B')
+        blocks.append(block)
+        spec[name] = (block.name, values.typecode, len(values))
+    return blocks, spec
+
+def attach_arrays(spec):
+    """
+    Attaches to arrays shared by share_arrays.  Meant for the worker
+    processes of the process that shared them, which share its resource
+    tracker and so leave the blocks for it to unlink.
+
+    inputs:
+        - spec: the description returned by share_arrays
+
+    Returns: a tuple (blocks, views): the attached SharedMemory blocks,
+    which must stay referenced while the views are used, and a dictionary
+    mapping names to read-only memoryviews indexed like the arrays.
+    """
+    from multiprocessing import shared_memory
+    blocks = []
+    views = {}
+    for name, (block_name, typecode, length) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        itemsize = array(typecode).itemsize
+        views[name] = block.buf[:length * itemsize].toreadonly().cast(typecode)
+    return blocks, views
+
+@contextlib.contextmanager
+def shared_arrays(arrays):
+    """
+    Shares arrays with share_arrays for the duration of a with block, and
+    closes and unlinks the shared memory blocks when it ends.
+
+    inputs:
+        - arrays: a dictionary mapping names to array.array objects
+
+    Yields: the description to pass to attach_worker or attach_arrays.
+    """
+    blocks, spec = share_arrays(arrays)
+    try:
+        yield spec
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+# The shared arrays of a worker process, set by attach_worker.
+_WORKER_ARRAYS = None
+
+def attach_worker(spec):
+    """
+    Attaches a worker process to arrays shared by share_arrays.  Meant to
+    be the initializer of a process pool; the workers then read the
+    arrays with worker_arrays.
+
+    inputs:
+        - spec: the description returned by share_arrays
+    """
+    global _WORKER_ARRAYS
+    _WORKER_ARRAYS = attach_arrays(spec)
+
+def map_worker(path):
+    """
+    Like attach_worker, but memory-maps a file written by save_arrays, so
+    that every worker shares the file's pages instead of a copy.
+
+    inputs:
+        - path: the name of the file
+    """
+    global _WORKER_ARRAYS
+    _, mapping, views = map_arrays(path)
+    _WORKER_ARRAYS = (mapping, views)
+
+def worker_arrays():
+    """
+    Returns: the dictionary of read-only memoryviews attached by
+    attach_worker or map_worker in this worker process.
+    """
+    return _WORKER_ARRAYS[1]
@@ -0,0 +1,83 @@
+"""
+Memoized distance functions for mapsearch.astar.
+
+astar calls edge_distance and straight_line_distance on every relaxation,
+and on street maps both usually recompute trigonometry from node
+coordinates.  A DistanceCache computes every edge distance once per graph
+and remembers heuristic values per target:
+
+    cache = DistanceCache(graph, edge_distance, straight_line_distance)
+    parent = mapsearch.astar(graph, start, end, cache.edge_distance,
+                             cache.straight_line_distance)
+"""
+
+import collections
+from csrgraph import CSRGraph
+
+class DistanceCache:
+    """
+    Precomputed edge distances and memoized heuristic values for one graph.
+    """
+
+    def __init__(self, graph, edge_distance, straight_line_distance=None,
+                 max_targets=64):
+        """
+        Computes the distance of every edge of graph.
+
+        inputs:
+            - graph: a directed Graph object representing a street map
+            - edge_distance: a function which takes two nodes and a graph
+              and returns the actual distance between two neighboring nodes
+            - straight_line_distance: a function which takes two nodes and
+              a graph and returns the straight line distance between them
+            - max_targets: the number of targets whose heuristic values
+              are kept; the least recently used target is evicted first
+        """
+        self._graph = graph
+        self._edges = CSRGraph.from_graph(graph, edge_distance)
+        self._straight_line_distance = straight_line_distance
+        self._max_targets = max_targets
+        self._heuristics = collections.OrderedDict()
+        self._target = None
+        self._target_values = None
+
+    def edge_distance(self, node1, node2, graph=None):
+        """
+        Returns: the precomputed distance of the edge from node1 to node2.
+        The graph input is ignored; it is accepted so that this method
+        can be passed to astar as its edge_distance function.
+        """
+        return self._edges.edge_distance(node1, node2)
+
+    def straight_line_distance(self, node, target, graph=None):
+        """
+        Returns: the straight line distance from node to target, computed
+        on first use for each pair and remembered after that.  The graph
+        input is ignored, like in edge_distance.
+        """
+        if target != self._target:
+            values = self._heuristics.get(target)
+            if values is None:
+                values = {}
+                self._heuristics[target] = values
+                if len(self._heuristics) > self._max_targets:
+                    self._heuristics.popitem(last=False)
+            else:
+                self._heuristics.move_to_end(target)
+            self._target = target
+            self._target_values = values
+
+        values = self._target_values
+        value = values.get(node)
+        if value is None:
+            value = self._straight_line_distance(node, target, self._graph)
+            values[node] = value
+        return value
+
+    def clear_heuristics(self):
+        """
+        Forgets all memoized heuristic values.
+        """
+        self._heuristics.clear()
+        self._target = None
+        self._target_values = None
@@ -2,59 +2,13 @@
 The Kevin Bacon Game.
 """
 
-import simpleplot
-import comp140_module4 as movies
-
-class Queue:
-    """
-    A simple implementation of a FIFO queue.
-    """
-
-    def __init__(self):
-        """
-        Initialize the queue.
-        """
-        self._queue = []
-
-    def __len__(self):
-        """
-        Returns: an integer representing the number of items in the queue.
-        """
-        return len(self._queue)
-
-    def __str__(self):
-        """
-        Returns: a string representation of the queue.
-        """
-        return str(self._queue)
-
-    def push(self, item):
-        """
-        Add item to the queue.
-
-        input:
-            - item: any data type that's valid in a list
-        """
-        (self._queue).append(item)
-
-    def pop(self):
-        """
-        Remove the least recently added item.
-
-        Assumes that there is at least one element in the queue.  It
-        is an error if there is not.  You do not need to check for
-        this condition.
-
-        Returns: the least recently added item.
-        """
-        return (self._queue).pop(0)
-
-    def clear(self):
-        """
-        Remove all items from the queue.
-        """
-        self._queue = []
-
+import contextlib
+from array import array
+from rac import Queue
+from csrgraph import (CSRGraph, level_sizes, shared_arrays, attach_worker, map_worker,
+                      worker_arrays)
+from moviegraph import MovieGraph
+from mapsearch import bidirectional_bfs
 
 def bfs(graph, start_node):
     """
@@ -70,6 +24,8 @@ def bfs(graph, start_node):
     was visited and a dictionary associating each visited node
     with its parent node.
     """
+    if isinstance(graph, (CSRGraph, MovieGraph)):
+        return _bfs_csr(graph, start_node)
     dist = {}
     parent = {}
 #Initialize all nodes as keys in "dist" and "parent" with default values
@@ -91,6 +47,35 @@ def bfs(graph, start_node):
     return (dist, parent)
 
 
+def _bfs_csr(csr, start_node):
+    """
+    bfs on a CSRGraph or MovieGraph, searching over node ids and arrays
+    instead of dictionaries keyed by node.
+    """
+    offsets = csr.offsets
+    targets = csr.targets
+    dist = array('i', [-1]) * len(csr)
+    parent = array('i', [-1]) * len(csr)
+    start = csr.node_id(start_node)
+    dist[start] = 0
+    frontier = [start]
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for node in frontier:
+            for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                if dist[neighbor] < 0:
+                    dist[neighbor] = level
+                    parent[neighbor] = node
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    names = csr.nodes()
+    return ({name: (distance if distance >= 0 else float("inf"))
+             for name, distance in zip(names, dist)},
+            {name: (names[previous] if previous >= 0 else None)
+             for name, previous in zip(names, parent)})
+
 def distance_histogram(graph, node):
     """
     Computes the distance between the given node and all other
@@ -115,7 +100,113 @@ def distance_histogram(graph, node):
     return histogram
 
 
-def find_path(graph, start_person, end_person, parents):
+def _histogram_from_sizes(sizes, num_nodes):
+    """
+    Converts the level sizes of a breadth-first search into the histogram
+    format of distance_histogram.
+    """
+    histogram = dict(enumerate(sizes))
+    unreachable = num_nodes - sum(sizes)
+    if unreachable > 0:
+        histogram[float("inf")] = unreachable
+    return histogram
+
+def _histograms_in_worker(sources):
+    """
+    Computes the histograms for a chunk of source ids in a worker process.
+    """
+    views = worker_arrays()
+    num_nodes = len(views["offsets"]) - 1
+    return [_histogram_from_sizes(level_sizes(views["offsets"], views["targets"], source),
+                                  num_nodes)
+            for source in sources]
+
+def all_distance_histograms(graph, sources=None, workers=None, chunksize=64):
+    """
+    Computes the distance histogram of many nodes, running one
+    breadth-first search per node over a compact copy of the graph.
+
+    inputs:
+        - graph: a graph object; a CSRGraph or MovieGraph is searched
+          without converting it
+        - sources: a list of nodes in graph, or None for every node
+        - workers: the number of worker processes, or None to search in
+          this process; workers share one read-only copy of the graph,
+          the mapped file itself for a MovieGraph
+        - chunksize: the number of sources sent to a worker at a time
+
+    returns: a dictionary mapping each source to its histogram, as
+    computed by distance_histogram.
+    """
+    if isinstance(graph, (CSRGraph, MovieGraph)):
+        csr = graph
+    else:
+        csr = CSRGraph.from_graph(graph)
+    if sources is None:
+        sources = csr.nodes()
+    source_ids = [csr.node_id(node) for node in sources]
+    num_nodes = len(csr)
+
+    if not workers:
+        histograms = [_histogram_from_sizes(level_sizes(csr.offsets, csr.targets, source),
+                                            num_nodes)
+                      for source in source_ids]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with contextlib.ExitStack() as stack:
+            if isinstance(csr, MovieGraph):
+                initializer, initargs = map_worker, (csr.path,)
+            else:
+                spec = stack.enter_context(shared_arrays({"offsets": csr.offsets,
+                                                          "targets": csr.targets}))
+                initializer, initargs = attach_worker, (spec,)
+            with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                     initargs=initargs) as executor:
+                chunks = [source_ids[idx:idx + chunksize]
+                          for idx in range(0, len(source_ids), chunksize)]
+                histograms = []
+                for chunk_histograms in executor.map(_histograms_in_worker, chunks):
+                    histograms.extend(chunk_histograms)
+    return dict(zip(sources, histograms))
+
+def eccentricities(histograms):
+    """
+    Computes the eccentricity of each node: its largest distance to any
+    node it can reach.
+
+    inputs:
+        - histograms: a dictionary mapping nodes to distance histograms,
+          as returned by all_distance_histograms
+
+    returns: a dictionary mapping each node to its eccentricity.
+    """
+    return {node: max(dist for dist in histogram if dist != float("inf"))
+            for node, histogram in histograms.items()}
+
+
+def _with_movies(graph, path_key, edge_attrs=None):
+    """
+    Pairs each actor on a path with the movies shared with the next actor.
+
+    inputs:
+        - graph: a graph oject with edges representing the connections between people
+        - path_key: a list of actors from the start to the end of the path
+        - edge_attrs: an optional CSRGraph of graph built with keep_attrs,
+          from which all shared movies are fetched at once
+
+    returns a list of tuples of the path in the form:
+        [(actor1, {movie1a, ...}), (actor2, {movie2a, ...}), ...]
+    """
+    if edge_attrs is not None:
+        movies = edge_attrs.path_attrs(path_key)
+    else:
+        movies = [graph.get_attrs(actor, next_actor)
+                  for actor, next_actor in zip(path_key, path_key[1:])]
+    path = list(zip(path_key, movies))
+    path.append((path_key[-1], set()))
+    return path
+
+def find_path(graph, start_person, end_person, parents, edge_attrs=None):
     """
     Computes the path from start_person to end_person in the graph.
 
@@ -124,30 +215,88 @@ def find_path(graph, start_person, end_person, parents):
         - start_person: a node in graph representing the starting node
         - end_person: a node in graph representing the ending node
         - parents: a dictionary representing the parents in the graph
+        - edge_attrs: an optional CSRGraph of graph built with keep_attrs,
+          used to look up the shared movies
 
     returns a list of tuples of the path in the form:
         [(actor1, {movie1a, ...}), (actor2, {movie2a, ...}), ...]
     """
-    path = []
-    parent = parents[end_person]
-    path_key = [parent,end_person]
 #Checking conditions if start_person and end_person are the same, 
 #and if end_person does not have a parent
     if start_person == end_person:
         return [(end_person,set())]
-    if parent == None:
+    if parents[end_person] == None:
         return []
-#Append actors to "path_key" in the order from start_person to end_person
-    while parent != start_person:
-        parent = parents[parent]
-        path_key.insert(0, parent)
-#Append tuples consisting of actor and shared movies to "path"
-    for idx in range(len(path_key)-1):        
-        path.append((path_key[idx],graph.get_attrs(path_key[idx], path_key[idx+1])))
-    path.append((end_person,set()))
-    return path
+#Walk back from end_person, then reverse into start_person to end_person order
+    path_key = [end_person]
+    node = end_person
+    while node != start_person:
+        node = parents[node]
+        path_key.append(node)
+    path_key.reverse()
+    return _with_movies(graph, path_key, edge_attrs)
+
+def all_shortest_paths(graph, start_person, end_person, dist=None, edge_attrs=None):
+    """
+    Generates every shortest path from start_person to end_person, one at
+    a time, for "alternative connections" queries.
+
+    inputs:
+        - graph: a graph oject with edges representing the connections between people
+        - start_person: a node in graph representing the starting node
+        - end_person: a node in graph representing the ending node
+        - dist: the distance dictionary returned by bfs(graph, start_person);
+          computed if not given
+        - edge_attrs: an optional CSRGraph of graph built with keep_attrs,
+          used to look up the shared movies
+
+    Yields: each shortest path in the format returned by find_path.
+    """
+    if dist is None:
+        dist = bfs(graph, start_person)[0]
+    if dist.get(end_person, float("inf")) == float("inf"):
+        return
+#Walk back from end_person through neighbors one step closer to
+#start_person; every such walk is a shortest path
+    path_key = [end_person]
+    stack = [iter([end_person])]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            path_key.pop()
+            continue
+        path_key[-1] = node
+        if node == start_person:
+            yield _with_movies(graph, path_key[::-1], edge_attrs)
+            continue
+        level = dist[node] - 1
+        stack.append(iter([neighbor for neighbor in graph.get_neighbors(node)
+                           if dist.get(neighbor) == level]))
+        path_key.append(None)
+
+def find_connection(graph, start_person, end_person):
+    """
+    Computes a shortest path from start_person to end_person without
+    searching the whole graph: a breadth-first search runs from both
+    people and stops as soon as the two searches meet.
+
+    inputs:
+        - graph: a graph oject with edges representing the connections between people
+        - start_person: a node in graph representing the starting node
+        - end_person: a node in graph representing the ending node
 
-def play_kevin_bacon_game(graph, start_person, end_people):
+    returns a list of tuples of the path in the form:
+        [(actor1, {movie1a, ...}), (actor2, {movie2a, ...}), ...]
+    or an empty list if the two people are not connected.
+    """
+#Connections between people go both ways, so graph is its own reverse
+    parents = bidirectional_bfs(graph, start_person, end_person, reverse_graph=graph)
+    if end_person not in parents:
+        return []
+    return find_path(graph, start_person, end_person, parents)
+
+def play_kevin_bacon_game(graph, start_person, end_people, cache=None):
     """
     Play the "Kevin Bacon Game" on the actors in the given
     graph.
@@ -156,16 +305,28 @@ def play_kevin_bacon_game(graph, start_person, end_people):
         - graph: a graph object with edges representing the connections between people
         - start_person: a node in graph representing the node from which the search will start
         - end_people: a list of nodes in graph to which the search will be performed
+        - cache: an optional bfscache.BFSCache holding search trees for graph
 
     Prints the results out.
     """
+    import comp140_module4 as movies
+    #The search from start_person is the same for every end_person
+    if cache is None:
+        parents = bfs(graph, start_person)[1]
     for end_person in end_people:
-        movies.print_path(find_path(graph, start_person, end_person, (bfs(graph, start_person))[1]))
+        if cache is None:
+            path = find_path(graph, start_person, end_person, parents)
+        else:
+            path = cache.find_path(graph, start_person, end_person)
+        movies.print_path(path)
 
 def run():
     """
     Load a graph and play the Kevin Bacon Game.
     """
+    import simpleplot
+    import comp140_module4 as movies
+
     graph5000 = movies.load_graph('subgraph5000')
 
     if len(graph5000.nodes()) > 0:
@@ -183,6 +344,5 @@ def run():
             simpleplot.plot_bars(person, 400, 300, 'Distance', \
                 'Frequency', [hist], ["distance frequency"])
 
-# Uncomment the call to run below when you have completed your code.
-
-run()
+if __name__ == "__main__":
+    run()
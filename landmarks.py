@@ -0,0 +1,169 @@
+"""
+Landmark (ALT) heuristics for mapsearch.astar.
+
+Preprocessing picks a few landmark nodes and stores the exact shortest
+path distances from every landmark to every node and from every node to
+every landmark.  The triangle inequality then gives a lower bound on the
+distance between any two nodes, which is usually much tighter on street
+maps than the straight line distance:
+
+    table = LandmarkHeuristic.build(graph, edge_distance, 16)
+    table.save("city.alt")
+    ...
+    table = LandmarkHeuristic.load("city.alt")
+    parent = mapsearch.astar(graph, start, end, edge_distance, table.heuristic)
+"""
+
+from array import array
+from csrgraph import CSRGraph, shortest_path_tree, save_arrays, load_arrays
+
+INFINITY = float("inf")
+
+def select_landmarks(csr, count, first=0):
+    """
+    Chooses landmarks with the farthest-first rule: each new landmark is
+    the reachable node farthest from all landmarks chosen so far.
+
+    inputs:
+        - csr: a CSRGraph with edge distances
+        - count: the number of landmarks to choose
+        - first: the id of the node the selection starts from
+
+    Returns: a list of at most count node ids.
+    """
+    num_nodes = len(csr)
+    if num_nodes == 0 or count <= 0:
+        return []
+    nearest = array('d', [INFINITY]) * num_nodes
+    landmarks = []
+    candidate = first
+    while len(landmarks) < count and candidate is not None:
+        landmarks.append(candidate)
+        dist, _ = shortest_path_tree(csr, candidate)
+        for node in range(num_nodes):
+            if dist[node] < nearest[node]:
+                nearest[node] = dist[node]
+        #The next landmark is the node whose nearest landmark is farthest
+        candidate = None
+        best = 0.0
+        for node in range(num_nodes):
+            if best < nearest[node] < INFINITY:
+                best = nearest[node]
+                candidate = node
+    return landmarks
+
+class LandmarkHeuristic:
+    """
+    Precomputed landmark distance tables that provide an admissible A*
+    heuristic.
+    """
+
+    def __init__(self, names, landmarks, dist_from, dist_to):
+        """
+        Creates a new LandmarkHeuristic from its tables.  Use build or load
+        to create one.
+
+        inputs:
+            - names: a list of the nodes, indexed by node id
+            - landmarks: a list of landmark node ids
+            - dist_from: an array of len(landmarks) * len(names) floats;
+              entry i * len(names) + v is the distance from landmark i to v
+            - dist_to: an array of the same shape with the distances from
+              each node to each landmark
+        """
+        self._names = names
+        self._ids = {name: idx for idx, name in enumerate(names)}
+        self.landmarks = landmarks
+        self._dist_from = dist_from
+        self._dist_to = dist_to
+        self._target = None
+        self._target_bounds = None
+
+    @classmethod
+    def build(cls, graph, edge_distance, count=16):
+        """
+        Runs the preprocessing for a graph.
+
+        inputs:
+            - graph: a directed Graph object representing a street map
+            - edge_distance: a function which takes two nodes and a graph
+              and returns the actual distance between two neighboring nodes
+            - count: the number of landmarks
+
+        Returns: a new LandmarkHeuristic for graph.
+        """
+        csr = CSRGraph.from_graph(graph, edge_distance)
+        reverse = csr.reverse()
+        landmarks = select_landmarks(csr, count)
+        dist_from = array('d')
+        dist_to = array('d')
+        for landmark in landmarks:
+            dist_from.extend(shortest_path_tree(csr, landmark)[0])
+            dist_to.extend(shortest_path_tree(reverse, landmark)[0])
+        return cls(csr.nodes(), landmarks, dist_from, dist_to)
+
+    def save(self, path):
+        """
+        Writes the tables to a file.  The nodes must be JSON-serializable.
+
+        inputs:
+            - path: the name of the file to write
+        """
+        save_arrays(path, {"names": self._names, "landmarks": self.landmarks},
+                    {"dist_from": self._dist_from, "dist_to": self._dist_to})
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads tables written by save.
+
+        inputs:
+            - path: the name of the file to read
+
+        Returns: a new LandmarkHeuristic.
+        """
+        header, arrays = load_arrays(path)
+        names = [tuple(name) if isinstance(name, list) else name
+                 for name in header["names"]]
+        return cls(names, header["landmarks"], arrays["dist_from"], arrays["dist_to"])
+
+    def _bounds_for(self, target):
+        """
+        Returns: a list with, for each landmark, the pair (distance from
+        the landmark to target, distance from target to the landmark).
+        """
+        if target != self._target:
+            num_nodes = len(self._names)
+            idx = self._ids[target]
+            self._target_bounds = [
+                (self._dist_from[row * num_nodes + idx], self._dist_to[row * num_nodes + idx])
+                for row in range(len(self.landmarks))]
+            self._target = target
+        return self._target_bounds
+
+    def heuristic(self, node, target, graph=None):
+        """
+        Computes a lower bound on the distance from node to target.  The
+        signature matches the straight_line_distance function taken by
+        mapsearch.astar.
+
+        For each landmark L the triangle inequality gives
+        d(node, target) >= d(L, target) - d(L, node) and
+        d(node, target) >= d(node, L) - d(target, L).
+
+        Returns: the largest of these bounds, or 0.
+        """
+        num_nodes = len(self._names)
+        idx = self._ids[node]
+        dist_from = self._dist_from
+        dist_to = self._dist_to
+        best = 0.0
+        for row, (from_target, to_target) in enumerate(self._bounds_for(target)):
+            pos = row * num_nodes + idx
+            from_node = dist_from[pos]
+            if from_target < INFINITY and from_node < INFINITY:
+                best = max(best, from_target - from_node)
+            to_node = dist_to[pos]
+            if to_node < INFINITY and to_target < INFINITY:
+                best = max(best, to_node - to_target)
+        return best
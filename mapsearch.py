@@ -2,109 +2,13 @@
 Map Search
 """
 
-import comp140_module7 as maps
+import heapq
+import itertools
+from array import array
+from rac import Queue, Stack
+from csrgraph import CSRGraph
 
-class Queue:
-    """
-    A simple implementation of a FIFO queue.
-    """
-    def __init__(self):
-        """
-        Initialize the queue.
-        """
-        self._queue = []
-
-    def __len__(self):
-        """
-        Returns: an integer representing the number of items in the queue.
-        """
-        return len(self._queue)
-
-    def __str__(self):
-        """
-        Returns: a string representation of the queue.
-        """
-        return str(self._queue)
-
-    def push(self, item):
-        """
-        Add item to the queue.
-
-        input:
-            - item: any data type that's valid in a list
-        """
-        (self._queue).append(item)
-
-    def pop(self):
-        """
-        Remove the least recently added item.
-
-        Assumes that there is at least one element in the queue.  It
-        is an error if there is not.  You do not need to check for
-        this condition.
-
-        Returns: the least recently added item.
-        """
-        return (self._queue).pop(0)
-
-    def clear(self):
-        """
-        Remove all items from the queue.
-        """
-        self._queue = []
-
-
-class Stack:
-    """
-    A simple implementation of a LIFO stack.
-    """ 
-    def __init__(self):
-        """
-        Initialize the stack.
-        """
-        self._stack = []
-
-    def __len__(self):
-        """
-        Returns: an integer representing the number of items in the stack.        
-        """
-        return len(self._stack)
-
-    def __str__(self):
-        """
-        Returns: a string representation of the stack.
-        """
-        return str(self._stack)
-
-    def push(self, item):
-        """
-        Add item to the stack.
-
-        input:
-            - item: any data type that's valid in a list
-        """
-        (self._stack).append(item)
-
-    def pop(self):
-        """
-        Remove the most recently added item.
-
-        Assumes that there is at least one element in the stack.  It
-        is an error if there is not.  You do not need to check for
-        this condition.
-
-        Returns: the most recently added item.
-        """
-        return (self._stack).pop()
-
-    def clear(self):
-        """
-        Remove all items from the stack.
-        """
-        self._stack = []
-
-
-def bfs_dfs(graph, rac_class, start_node, end_node):
+def bfs_dfs(graph, rac_class, start_node, end_node, stats=None):
     """
     Performs a breadth-first search or a depth-first search on graph
     starting at the start_node.  The rac_class should either be a
@@ -119,10 +23,16 @@ def bfs_dfs(graph, rac_class, start_node, end_node):
           use for the search
         - start_node: a node in graph representing the start
         - end_node: a node in graph representing the end
+        - stats: an optional searchstats.SearchStats to record the work
+          done in the "init" and "search" phases
 
     Returns: a dictionary associating each visited node with its parent
     node.
     """
+    if stats is not None:
+        return _bfs_dfs_stats(graph, rac_class, start_node, end_node, stats)
+    if isinstance(graph, CSRGraph):
+        return _bfs_dfs_csr(graph, rac_class, start_node, end_node)
     dist = {}
     parent = {}
 #Initialize all nodes as keys in "dist" and "parent" with default values
@@ -130,10 +40,7 @@ def bfs_dfs(graph, rac_class, start_node, end_node):
         dist[node] = float("inf")
         parent[node] = None
     dist[start_node] = 0
-    if rac_class == Queue:
-        container = Queue()
-    else:
-        container = Stack()
+    container = rac_class()
     container.push(start_node)
 #Iterate through nodes in "container" and 
 #setting their actual values in "dist" and "parent"
@@ -148,14 +55,19 @@ def bfs_dfs(graph, rac_class, start_node, end_node):
                     return parent
     return parent
 
-
-def dfs(graph, start_node, end_node, parent):
+def dfs(graph, start_node, end_node, parent, stop_at_end=False, stats=None):
     """
-    Performs a recursive depth-first search on graph starting at the
+    Performs a depth-first search on graph starting at the
     start_node.
 
+    Visits nodes in the same order as a recursive depth-first search,
+    but keeps its own stack of neighbor iterators, so the depth of the
+    search is not limited by Python's recursion limit.
+
     Completes when end_node is found or entire graph has been
-    searched.
+    searched.  Like the recursive search, finding end_node only ends the
+    search of end_node's parent; the rest of the graph is still explored
+    unless stop_at_end is True.
 
     inputs:
         - graph: a directed Graph object representing a street map
@@ -163,23 +75,40 @@ def dfs(graph, start_node, end_node, parent):
         - end_node: a node in graph representing the end
         - parent: a dictionary that initially has one entry associating
                   the original start_node with None
+        - stop_at_end: if True, return as soon as end_node is found
+        - stats: an optional searchstats.SearchStats to record the work
+          done in the "search" phase
 
     Modifies the input parent dictionary to associate each visited node
     with its parent node
     """
-    for nbr in graph.get_neighbors(start_node):
-        if nbr not in parent.keys():
-            parent[nbr] = start_node
-            #Perform depth first search recursively on the neighbors of
-            #start_node until end_node is found, then return updated parent
-            if nbr == end_node:
-                return parent
-            else:
-                dfs(graph, nbr, end_node, parent)
+    if stats is not None:
+        return _dfs_stats(graph, start_node, end_node, parent, stop_at_end, stats)
+    if isinstance(graph, CSRGraph):
+        return _dfs_csr(graph, start_node, end_node, parent, stop_at_end)
+    #Each stack entry is a node and the iterator over its remaining
+    #neighbors, standing in for one level of recursion
+    stack = [(start_node, iter(graph.get_neighbors(start_node)))]
+    while len(stack) > 0:
+        node, neighbors = stack[-1]
+        for nbr in neighbors:
+            if nbr not in parent:
+                parent[nbr] = node
+                #Once end_node is found, stop searching from its parent
+                #(or stop entirely); otherwise descend into the neighbor
+                if nbr == end_node:
+                    if stop_at_end:
+                        return parent
+                    stack.pop()
+                else:
+                    stack.append((nbr, iter(graph.get_neighbors(nbr))))
+                break
+        else:
+            stack.pop()
     return parent
 
 def astar(graph, start_node, end_node,
-          edge_distance, straight_line_distance):
+          edge_distance, straight_line_distance, cost_bound=None, stats=None):
     """
     Performs an A* search on graph starting at start_node.
 
@@ -196,57 +125,511 @@ def astar(graph, start_node, end_node,
         - straight_line_distance: a function which takes two nodes and
                          a graph and returns the straight line distance 
                          between two nodes
+        - cost_bound: an optional number; the search stops early once
+                      every remaining path is estimated to cost more
+        - stats: an optional searchstats.SearchStats to record the work
+          done in the "search" phase
 
     Returns: a dictionary associating each visited node with its parent
     node.
     """
-    #Initialize values for start_node in parent, gcost, hcost, fcost
-    #and openset and closedset
+    if stats is not None:
+        return _astar_stats(graph, start_node, end_node, edge_distance,
+                            straight_line_distance, cost_bound, stats)
+    if isinstance(graph, CSRGraph):
+        return _astar_csr(graph, start_node, end_node, edge_distance,
+                          straight_line_distance, cost_bound)
+    #Initialize values for start_node in parent, gcost, hcost,
+    #the open set (a heap of (fcost, tie breaker, node) entries) and closedset
     parent = {start_node:None}
     gcost = {start_node:0}
     hcost = {start_node:straight_line_distance(start_node, end_node, graph)}
-    fcost = {start_node:gcost[start_node] + hcost[start_node]}
-    openset = {start_node:fcost[start_node]}
-    closedset = []
-    
-    while len(openset) > 0:
-        #Find the node with the minimum f cost, remove it from openset
-        #and place it in closedset
-        min_cost = float("inf")
-        min_node = None
-        for node in openset:
-            if openset[node] < min_cost:
-                min_cost = openset[node]
-                min_node = node
-        openset.pop(min_node)
-        closedset.append(min_node)
-        
+    order = itertools.count()
+    openheap = [(gcost[start_node] + hcost[start_node], next(order), start_node)]
+    closedset = set()
+
+    while len(openheap) > 0:
+        #Pop the node with the minimum f cost and place it in closedset.
+        #Nodes whose cost improved are pushed again, so entries for
+        #nodes that are already closed are stale and skipped
+        min_cost, _, min_node = heapq.heappop(openheap)
+        if min_node in closedset:
+            continue
+        if cost_bound is not None and min_cost > cost_bound:
+            return parent
+        closedset.add(min_node)
+
         if min_node == end_node:
             return parent
+        for neighbor in graph.get_neighbors(min_node):
+            if neighbor in closedset:
+                continue
+            g_new = gcost[min_node] + edge_distance(min_node, neighbor, graph)
+            #If neighbor is already in the open set, only update it when a
+            #shorter actual path has been found; otherwise initialize its hcost
+            if neighbor in gcost:
+                if g_new >= gcost[neighbor]:
+                    continue
+            else:
+                hcost[neighbor] = straight_line_distance(neighbor, end_node, graph)
+            gcost[neighbor] = g_new
+            parent[neighbor] = min_node
+            heapq.heappush(openheap, (g_new + hcost[neighbor], next(order), neighbor))
+    return parent
+
+def _bfs_dfs_csr(csr, rac_class, start_node, end_node):
+    """
+    bfs_dfs on a CSRGraph, searching over node ids and arrays instead of
+    dictionaries keyed by node.
+    """
+    offsets = csr.offsets
+    targets = csr.targets
+    parent = array('i', [-1]) * len(csr)
+    visited = bytearray(len(csr))
+    start = csr.node_id(start_node)
+    end = csr.node_id(end_node) if csr.has_node(end_node) else -1
+    visited[start] = 1
+    container = rac_class()
+    container.push(start)
+    while len(container) > 0:
+        node = container.pop()
+        for neighbor in targets[offsets[node]:offsets[node + 1]]:
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                parent[neighbor] = node
+                container.push(neighbor)
+                if neighbor == end:
+                    return _parent_names(csr, parent)
+    return _parent_names(csr, parent)
+
+def _parent_names(csr, parent):
+    """
+    Returns: a dictionary associating every node of csr with the node
+    whose id is in the parent array (None for -1).
+    """
+    names = csr.nodes()
+    return {name: (names[previous] if previous >= 0 else None)
+            for name, previous in zip(names, parent)}
+
+def _dfs_csr(csr, start_node, end_node, parent, stop_at_end):
+    """
+    dfs on a CSRGraph, searching over node ids and arrays instead of
+    dictionaries keyed by node.
+    """
+    offsets = csr.offsets
+    targets = csr.targets
+    visited = bytearray(len(csr))
+    for node in parent:
+        visited[csr.node_id(node)] = 1
+    end = csr.node_id(end_node) if csr.has_node(end_node) else -1
+    found = []
+    start = csr.node_id(start_node)
+    stack = [(start, iter(targets[offsets[start]:offsets[start + 1]]))]
+    while len(stack) > 0:
+        node, neighbors = stack[-1]
+        for nbr in neighbors:
+            if not visited[nbr]:
+                visited[nbr] = 1
+                found.append((nbr, node))
+                if nbr == end:
+                    if stop_at_end:
+                        stack = []
+                    else:
+                        stack.pop()
+                else:
+                    stack.append((nbr, iter(targets[offsets[nbr]:offsets[nbr + 1]])))
+                break
         else:
-            for neighbor in graph.get_neighbors(min_node):
-                #If neighbor is in open set, check if a shorter actual path has been
-                #found and if yes, update gcost, fcost, parent of neighbor
-                if neighbor in openset:
-                    g_old = gcost[neighbor]
-                    g_new = gcost[min_node] + edge_distance(min_node, neighbor, graph)
-                    if g_new < g_old:
-                        gcost[neighbor] = g_new
-                        fcost[neighbor] = g_new + hcost[neighbor]
-                        parent[neighbor] = min_node
-                        openset[neighbor] = fcost[neighbor]
-                #If neighbor is in neither openset nor closedset, initialize its
-                #values in gcost, hcost, fcost, parent
-                elif neighbor not in closedset:
-                    gcost[neighbor] = gcost[min_node] + edge_distance(min_node, neighbor, graph)
+            stack.pop()
+    for nbr, node in found:
+        parent[csr.node_name(nbr)] = csr.node_name(node)
+    return parent
+
+def _astar_csr(csr, start_node, end_node, edge_distance, straight_line_distance,
+               cost_bound):
+    """
+    astar on a CSRGraph, keeping costs in arrays indexed by node id.  If
+    edge_distance is csr.edge_distance, the stored edge weights are read
+    directly.
+    """
+    offsets = csr.offsets
+    targets = csr.targets
+    weights = csr.weights
+    use_weights = weights is not None and edge_distance == csr.edge_distance
+    node_name = csr.node_name
+    num_nodes = len(csr)
+    start = csr.node_id(start_node)
+    end = csr.node_id(end_node) if csr.has_node(end_node) else -1
+
+    parent = {start: -1}
+    gcost = array('d', [0.0]) * num_nodes
+    hcost = array('d', [0.0]) * num_nodes
+    seen = bytearray(num_nodes)
+    closed = bytearray(num_nodes)
+    seen[start] = 1
+    hcost[start] = straight_line_distance(start_node, end_node, csr)
+    order = itertools.count()
+    openheap = [(hcost[start], next(order), start)]
+
+    while len(openheap) > 0:
+        min_cost, _, min_node = heapq.heappop(openheap)
+        if closed[min_node]:
+            continue
+        if cost_bound is not None and min_cost > cost_bound:
+            break
+        closed[min_node] = 1
+        if min_node == end:
+            break
+        min_gcost = gcost[min_node]
+        for pos in range(offsets[min_node], offsets[min_node + 1]):
+            neighbor = targets[pos]
+            if closed[neighbor]:
+                continue
+            if use_weights:
+                g_new = min_gcost + weights[pos]
+            else:
+                g_new = min_gcost + edge_distance(node_name(min_node), node_name(neighbor), csr)
+            if seen[neighbor]:
+                if g_new >= gcost[neighbor]:
+                    continue
+            else:
+                seen[neighbor] = 1
+                hcost[neighbor] = straight_line_distance(node_name(neighbor), end_node, csr)
+            gcost[neighbor] = g_new
+            parent[neighbor] = min_node
+            heapq.heappush(openheap, (g_new + hcost[neighbor], next(order), neighbor))
+    return {node_name(node): (node_name(previous) if previous >= 0 else None)
+            for node, previous in parent.items()}
+
+def _bfs_dfs_stats(graph, rac_class, start_node, end_node, stats):
+    """
+    bfs_dfs with every step recorded in stats.
+    """
+    stats.searches += 1
+    dist = {}
+    parent = {}
+#Initialize all nodes as keys in "dist" and "parent" with default values
+    with stats.phase("init"):
+        for node in graph.nodes():
+            dist[node] = float("inf")
+            parent[node] = None
+    dist[start_node] = 0
+    container = rac_class()
+    container.push(start_node)
+#Iterate through nodes in "container" and 
+#setting their actual values in "dist" and "parent"
+    with stats.phase("search"):
+        while len(container) > 0:
+            stats.frontier(len(container))
+            node = container.pop()
+            neighbors = graph.get_neighbors(node)
+            stats.nodes_expanded += 1
+            stats.edges_relaxed += len(neighbors)
+            for neighbor in neighbors:
+                if dist[neighbor] == float("inf"):
+                    dist[neighbor] = dist[node] + 1
+                    parent[neighbor] = node
+                    container.push(neighbor)
+                    if neighbor == end_node:
+                        return parent
+    return parent
+
+def _dfs_stats(graph, start_node, end_node, parent, stop_at_end, stats):
+    """
+    dfs with every step recorded in stats.
+    """
+    #Each stack entry is a node and the iterator over its remaining
+    #neighbors, standing in for one level of recursion
+    neighbors = graph.get_neighbors(start_node)
+    stats.searches += 1
+    stats.nodes_expanded += 1
+    stats.edges_relaxed += len(neighbors)
+    stack = [(start_node, iter(neighbors))]
+    with stats.phase("search"):
+        while len(stack) > 0:
+            node, neighbors = stack[-1]
+            for nbr in neighbors:
+                if nbr not in parent:
+                    parent[nbr] = node
+                    #Once end_node is found, stop searching from its parent
+                    #(or stop entirely); otherwise descend into the neighbor
+                    if nbr == end_node:
+                        if stop_at_end:
+                            return parent
+                        stack.pop()
+                    else:
+                        nbr_neighbors = graph.get_neighbors(nbr)
+                        stack.append((nbr, iter(nbr_neighbors)))
+                        stats.nodes_expanded += 1
+                        stats.edges_relaxed += len(nbr_neighbors)
+                        stats.frontier(len(stack))
+                    break
+            else:
+                stack.pop()
+    return parent
+
+def _astar_stats(graph, start_node, end_node, edge_distance,
+                 straight_line_distance, cost_bound, stats):
+    """
+    astar with every step recorded in stats.
+    """
+    stats.searches += 1
+    stats.heuristic_calls += 1
+    #Initialize values for start_node in parent, gcost, hcost,
+    #the open set (a heap of (fcost, tie breaker, node) entries) and closedset
+    parent = {start_node:None}
+    gcost = {start_node:0}
+    hcost = {start_node:straight_line_distance(start_node, end_node, graph)}
+    order = itertools.count()
+    openheap = [(gcost[start_node] + hcost[start_node], next(order), start_node)]
+    closedset = set()
+
+    with stats.phase("search"):
+        while len(openheap) > 0:
+            stats.frontier(len(openheap))
+            #Pop the node with the minimum f cost and place it in closedset.
+            #Nodes whose cost improved are pushed again, so entries for
+            #nodes that are already closed are stale and skipped
+            min_cost, _, min_node = heapq.heappop(openheap)
+            if min_node in closedset:
+                continue
+            if cost_bound is not None and min_cost > cost_bound:
+                return parent
+            closedset.add(min_node)
+
+            if min_node == end_node:
+                return parent
+            neighbors = graph.get_neighbors(min_node)
+            stats.nodes_expanded += 1
+            stats.edges_relaxed += len(neighbors)
+            for neighbor in neighbors:
+                if neighbor in closedset:
+                    continue
+                g_new = gcost[min_node] + edge_distance(min_node, neighbor, graph)
+                #If neighbor is already in the open set, only update it when a
+                #shorter actual path has been found; otherwise initialize its hcost
+                if neighbor in gcost:
+                    if g_new >= gcost[neighbor]:
+                        continue
+                else:
                     hcost[neighbor] = straight_line_distance(neighbor, end_node, graph)
-                    fcost[neighbor] = gcost[neighbor] + hcost[neighbor]
-                    parent[neighbor] = min_node
-                    openset[neighbor] = fcost[neighbor]
+                    stats.heuristic_calls += 1
+                gcost[neighbor] = g_new
+                parent[neighbor] = min_node
+                heapq.heappush(openheap, (g_new + hcost[neighbor], next(order), neighbor))
     return parent
 
-# You can replace functions/classes you have not yet implemented with
-# None in the call to "maps.start" below and the other elements will
-# work.
+class _ReverseGraph:
+    """
+    The predecessor lists of a directed graph, with the get_neighbors
+    interface of a graph whose edges all point the other way.
+    """
+
+    def __init__(self, graph):
+        """
+        Collects the predecessors of every node of graph.
+        """
+        self._preds = {node: [] for node in graph.nodes()}
+        for node in graph.nodes():
+            for neighbor in graph.get_neighbors(node):
+                self._preds[neighbor].append(node)
+
+    def get_neighbors(self, node):
+        """
+        Returns: a list of the nodes with an edge to node.
+        """
+        return self._preds[node]
+
+
+def _join_parents(parent, successor, meet_from, meet_to):
+    """
+    Extends the forward parent dictionary of a bidirectional search with
+    the backward half of the path, so that following parents from the
+    end node leads back to the start node.
+
+    inputs:
+        - parent: the forward search's dictionary of parents
+        - successor: the backward search's dictionary associating each
+          node with the next node towards the end node (None at the end)
+        - meet_from: the forward node of the edge where the searches met
+        - meet_to: the backward node of the edge where the searches met
+
+    Returns: parent, modified in place.
+    """
+    node = meet_to
+    previous = meet_from
+    while node is not None:
+        if node != previous:
+            parent[node] = previous
+        previous = node
+        node = successor[node]
+    return parent
+
+
+def bidirectional_bfs(graph, start_node, end_node, reverse_graph=None):
+    """
+    Performs a breadth-first search from both start_node and end_node
+    until the two searches meet.  Each step expands one whole level of
+    whichever frontier is smaller.
+
+    inputs:
+        - graph: a directed Graph object representing a street map
+        - start_node: a node in graph representing the start
+        - end_node: a node in graph representing the end
+        - reverse_graph: optionally, an object whose get_neighbors(node)
+          returns the nodes with an edge to node; it is built from graph
+          if not given
+
+    Returns: a dictionary associating each node visited by the forward
+    search with its parent node, extended with the rest of a shortest
+    path to end_node if one exists.
+    """
+    parent = {start_node: None}
+    if start_node == end_node:
+        return parent
+    if reverse_graph is None:
+        reverse_graph = _ReverseGraph(graph)
+
+    successor = {end_node: None}
+    dist = ({start_node: 0}, {end_node: 0})
+    forward = [start_node]
+    backward = [end_node]
+    while len(forward) > 0 and len(backward) > 0:
+        #Check every edge into the other search's visited nodes while
+        #expanding this level, and keep the one on the shortest path
+        best = None
+        if len(forward) <= len(backward):
+            next_level = []
+            for node in forward:
+                for neighbor in graph.get_neighbors(node):
+                    if neighbor in successor:
+                        length = dist[0][node] + 1 + dist[1][neighbor]
+                        if best is None or length < best[0]:
+                            best = (length, node, neighbor)
+                    elif neighbor not in parent:
+                        parent[neighbor] = node
+                        dist[0][neighbor] = dist[0][node] + 1
+                        next_level.append(neighbor)
+            forward = next_level
+        else:
+            next_level = []
+            for node in backward:
+                for neighbor in reverse_graph.get_neighbors(node):
+                    if neighbor in parent:
+                        length = dist[0][neighbor] + 1 + dist[1][node]
+                        if best is None or length < best[0]:
+                            best = (length, neighbor, node)
+                    elif neighbor not in successor:
+                        successor[neighbor] = node
+                        dist[1][neighbor] = dist[1][node] + 1
+                        next_level.append(neighbor)
+            backward = next_level
+        if best is not None:
+            return _join_parents(parent, successor, best[1], best[2])
+    return parent
+
+
+def bidirectional_astar(graph, start_node, end_node, edge_distance,
+                        straight_line_distance, reverse_graph=None):
+    """
+    Performs an A* search from both start_node and end_node until the two
+    searches meet.
+
+    Both searches use the consistent average potential
+    (straight_line_distance(n, end_node) - straight_line_distance(start_node, n)) / 2,
+    forwards and negated backwards, and stop once the sum of their
+    smallest open costs reaches the shortest path found so far.
+
+    inputs:
+        - graph: a directed Graph object representing a street map
+        - start_node: a node in graph representing the start
+        - end_node: a node in graph representing the end
+        - edge_distance: a function which takes two nodes and a graph
+                         and returns the actual distance between two
+                         neighboring nodes
+        - straight_line_distance: a function which takes two nodes and
+                         a graph and returns the straight line distance
+                         between two nodes
+        - reverse_graph: optionally, an object whose get_neighbors(node)
+          returns the nodes with an edge to node; it is built from graph
+          if not given
+
+    Returns: a dictionary associating each node visited by the forward
+    search with its parent node, extended with the rest of a shortest
+    path to end_node if one exists.
+    """
+    parent = {start_node: None}
+    if start_node == end_node:
+        return parent
+    if reverse_graph is None:
+        reverse_graph = _ReverseGraph(graph)
+
+    potentials = {}
+    def potential(node):
+        """
+        Returns: the forward potential of node.
+        """
+        if node not in potentials:
+            potentials[node] = (straight_line_distance(node, end_node, graph) -
+                                straight_line_distance(start_node, node, graph)) / 2
+        return potentials[node]
+
+    successor = {end_node: None}
+    gcost = ({start_node: 0}, {end_node: 0})
+    links = (parent, successor)
+    closed = (set(), set())
+    order = itertools.count()
+    heaps = ([(potential(start_node), next(order), start_node)],
+             [(-potential(end_node), next(order), end_node)])
+    best = float("inf")
+    meeting = None
+
+    while len(heaps[0]) > 0 and len(heaps[1]) > 0:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        #Expand the side with the smaller open cost; side 0 is forward
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        _, _, node = heapq.heappop(heaps[side])
+        if node in closed[side]:
+            continue
+        closed[side].add(node)
+        if side == 0:
+            neighbors = graph.get_neighbors(node)
+        else:
+            neighbors = reverse_graph.get_neighbors(node)
+        for neighbor in neighbors:
+            if side == 0:
+                g_new = gcost[0][node] + edge_distance(node, neighbor, graph)
+            else:
+                g_new = gcost[1][node] + edge_distance(neighbor, node, graph)
+            if neighbor in closed[side] or g_new >= gcost[side].get(neighbor, float("inf")):
+                continue
+            gcost[side][neighbor] = g_new
+            links[side][neighbor] = node
+            sign = 1 if side == 0 else -1
+            heapq.heappush(heaps[side], (g_new + sign * potential(neighbor),
+                                         next(order), neighbor))
+            #A node reached by both searches completes a path
+            if neighbor in gcost[1 - side]:
+                length = g_new + gcost[1 - side][neighbor]
+                if length < best:
+                    best = length
+                    meeting = (node, neighbor) if side == 0 else (neighbor, node)
+
+    if meeting is None:
+        return parent
+    return _join_parents(parent, successor, meeting[0], meeting[1])
+
+def run():
+    """
+    Start the map search GUI.
+
+    You can replace functions/classes you have not yet implemented with
+    None in the call to "maps.start" below and the other elements will
+    work.
+    """
+    import comp140_module7 as maps
+    maps.start(bfs_dfs, Queue, Stack, dfs, astar)
 
-maps.start(bfs_dfs, Queue, Stack, dfs, astar)
+if __name__ == "__main__":
+    run()
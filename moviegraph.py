@@ -0,0 +1,230 @@
+"""
+A compact binary format for the movie graphs of the Kevin Bacon Game.
+
+movies.load_graph parses a text file on every start.  convert writes the
+same graph once as flat arrays: a sorted table of actor names, the CSR
+adjacency of the actors, and for each edge the ids of the shared movies
+in a separate table of movie titles.  MovieGraph memory-maps such a file,
+so it opens in milliseconds and worker processes that open the same file
+share one physical copy of it:
+
+    python moviegraph.py subgraph5000 subgraph5000.mgraph
+
+    graph = MovieGraph("subgraph5000.mgraph")
+    kevinbacongame.play_kevin_bacon_game(graph, "Kevin Bacon", ["Tina Fey"])
+"""
+
+import argparse
+import sys
+from array import array
+from csrgraph import save_arrays, map_arrays
+
+FORMAT = "moviegraph-1"
+
+def _string_table(strings):
+    """
+    Packs strings into one UTF-8 byte array.
+
+    Returns: a tuple (offsets, data): the bytes of string i are
+    data[offsets[i]:offsets[i+1]].
+    """
+    offsets = array('q', [0])
+    data = bytearray()
+    for string in strings:
+        data += string.encode("utf-8")
+        offsets.append(len(data))
+    return offsets, array('B', data)
+
+def convert(graph, path):
+    """
+    Writes a movie graph to a binary file that MovieGraph can open.
+
+    inputs:
+        - graph: a graph object whose nodes are actor names and whose
+          edge attributes are sets of movie titles
+        - path: the name of the file to write
+    """
+    #Sort names by their UTF-8 bytes so that MovieGraph can binary search them
+    actors = sorted(graph.nodes(), key=lambda name: name.encode("utf-8"))
+    actor_ids = {actor: idx for idx, actor in enumerate(actors)}
+    titles = set()
+    edges = []
+    offsets = array('q', [0])
+    targets = array('i')
+    for actor in actors:
+        neighbors = sorted(actor_ids[neighbor] for neighbor in graph.get_neighbors(actor))
+        for neighbor in neighbors:
+            movies = graph.get_attrs(actor, actors[neighbor])
+            titles.update(movies)
+            edges.append(movies)
+        targets.extend(neighbors)
+        offsets.append(len(targets))
+
+    titles = sorted(titles, key=lambda title: title.encode("utf-8"))
+    title_ids = {title: idx for idx, title in enumerate(titles)}
+    movie_offsets = array('q', [0])
+    movie_ids = array('i')
+    for movies in edges:
+        movie_ids.extend(sorted(title_ids[title] for title in movies))
+        movie_offsets.append(len(movie_ids))
+
+    actor_offsets, actor_data = _string_table(actors)
+    title_offsets, title_data = _string_table(titles)
+    save_arrays(path, {"format": FORMAT},
+                {"offsets": offsets, "targets": targets,
+                 "movie_offsets": movie_offsets, "movie_ids": movie_ids,
+                 "actor_offsets": actor_offsets, "actor_data": actor_data,
+                 "title_offsets": title_offsets, "title_data": title_data})
+
+class MovieGraph:
+    """
+    A read-only, memory-mapped movie graph with the nodes/get_neighbors/
+    get_attrs interface of the course graph objects.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a file written by convert.
+
+        inputs:
+            - path: the name of the file
+        """
+        header, self._mapping, views = map_arrays(path)
+        if header.get("format") != FORMAT:
+            raise ValueError("%s is not a movie graph file" % path)
+        self.path = path
+        self.offsets = views["offsets"]
+        self.targets = views["targets"]
+        self._movie_offsets = views["movie_offsets"]
+        self._movie_ids = views["movie_ids"]
+        self._actor_offsets = views["actor_offsets"]
+        self._actor_data = views["actor_data"]
+        self._title_offsets = views["title_offsets"]
+        self._title_data = views["title_data"]
+        #Names are decoded on demand; nodes() decodes them all once and
+        #keeps them for constant-time lookups from then on
+        self._names = None
+        self._ids = None
+
+    def __reduce__(self):
+        """
+        Pickles the graph as its file name, so that worker processes map
+        the file instead of receiving a copy.
+        """
+        return (MovieGraph, (self.path,))
+
+    def __len__(self):
+        """
+        Returns: the number of actors in the graph.
+        """
+        return len(self._actor_offsets) - 1
+
+    def _actor_bytes(self, node_id):
+        """
+        Returns: the UTF-8 bytes of the name of the actor with the given id.
+        """
+        offsets = self._actor_offsets
+        return self._actor_data[offsets[node_id]:offsets[node_id + 1]].tobytes()
+
+    def node_id(self, node):
+        """
+        Returns: the integer id of the given actor, found by binary search
+        of the sorted name table.  Raises KeyError if there is no such
+        actor.
+        """
+        if self._ids is not None:
+            return self._ids[node]
+        key = node.encode("utf-8")
+        low = 0
+        high = len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._actor_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self) or self._actor_bytes(low) != key:
+            raise KeyError(node)
+        return low
+
+    def node_name(self, node_id):
+        """
+        Returns: the actor with the given integer id.
+        """
+        if self._names is not None:
+            return self._names[node_id]
+        return self._actor_bytes(node_id).decode("utf-8")
+
+    def has_node(self, node):
+        """
+        Returns: True if node is in the graph, False otherwise.
+        """
+        try:
+            self.node_id(node)
+        except KeyError:
+            return False
+        return True
+
+    def nodes(self):
+        """
+        Returns: a list of all actors, in node id order.
+        """
+        if self._names is None:
+            offsets = self._actor_offsets
+            data = self._actor_data.tobytes()
+            self._names = [data[offsets[idx]:offsets[idx + 1]].decode("utf-8")
+                           for idx in range(len(self))]
+            self._ids = {name: idx for idx, name in enumerate(self._names)}
+        return list(self._names)
+
+    def neighbor_ids(self, node_id):
+        """
+        Returns: the ids of the neighbors of the actor with the given id.
+        """
+        return self.targets[self.offsets[node_id]:self.offsets[node_id + 1]]
+
+    def get_neighbors(self, node):
+        """
+        Returns: a list of the actors who share a movie with node.
+        """
+        node_name = self.node_name
+        return [node_name(target) for target in self.neighbor_ids(self.node_id(node))]
+
+    def _title(self, movie_id):
+        """
+        Returns: the title of the movie with the given id.
+        """
+        offsets = self._title_offsets
+        return self._title_data[offsets[movie_id]:offsets[movie_id + 1]].tobytes().decode("utf-8")
+
+    def get_attrs(self, node1, node2):
+        """
+        Returns: the set of titles of the movies node1 and node2 share.
+        Raises KeyError if they share none.
+        """
+        idx1 = self.node_id(node1)
+        idx2 = self.node_id(node2)
+        targets = self.targets
+        for pos in range(self.offsets[idx1], self.offsets[idx1 + 1]):
+            if targets[pos] == idx2:
+                movies = self._movie_ids[self._movie_offsets[pos]:self._movie_offsets[pos + 1]]
+                return {self._title(movie_id) for movie_id in movies}
+        raise KeyError((node1, node2))
+
+def main(argv=None):
+    """
+    Converts a movie graph from the course loader to the binary format.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("name", help="graph name passed to movies.load_graph")
+    parser.add_argument("output", help="file to write the binary graph to")
+    args = parser.parse_args(argv)
+
+    import comp140_module4 as movies
+    graph = movies.load_graph(args.name)
+    convert(graph, args.output)
+    print("wrote %d actors to %s" % (len(graph.nodes()), args.output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,61 @@
 QR Code Generator
 """
 
-import comp140_module5 as qrcode
-import comp140_module5_z256 as z256
+import collections
+import itertools
+import numbers
+
+# Reed-Solomon in QR codes works in GF(2^8) reduced by the primitive
+# polynomial x^8 + x^4 + x^3 + x^2 + 1, the same field used by the
+# comp140_module5_z256 module.
+GF_PRIMITIVE = 0x11D
+
+def _build_gf_tables():
+    """
+    Builds the exponent (antilog) and logarithm tables for Z_256 with
+    generator 2.
+
+    The exponent table is doubled in length so that the sum of two
+    logarithms can be used as an index without reducing it mod 255.
+
+    Returns: a tuple (exp_table, log_table) of bytes objects.
+    """
+    exp_table = bytearray(512)
+    log_table = bytearray(256)
+    value = 1
+    for power in range(255):
+        exp_table[power] = value
+        log_table[value] = power
+        value <<= 1
+        if value & 0x100:
+            value ^= GF_PRIMITIVE
+    for power in range(255, 512):
+        exp_table[power] = exp_table[power - 255]
+    return bytes(exp_table), bytes(log_table)
+
+_GF_EXP, _GF_LOG = _build_gf_tables()
+
+def _build_gf_mul_table():
+    """
+    Builds the full Z_256 multiplication table.
+
+    Returns: a bytes object of length 65536 in which the product of a
+    and b is stored at index (a << 8) | b.
+    """
+    table = bytearray(65536)
+    for num1 in range(1, 256):
+        log1 = _GF_LOG[num1]
+        row = num1 << 8
+        #Row entry b is 2^(log(num1) + log(b)): translate maps every log(b)
+        #through the slice of the exponent table starting at log(num1)
+        table[row:row + 256] = _GF_LOG.translate(_GF_EXP[log1:log1 + 256])
+        table[row] = 0
+    return bytes(table)
+
+# Arithmetic backend for Z_256 coefficients: addition and subtraction are
+# XOR, a * b is GF_MUL_TABLE[(a << 8) | b] and a / b is a * GF_INV_TABLE[b].
+GF_MUL_TABLE = _build_gf_mul_table()
+GF_INV_TABLE = bytes([0] + [_GF_EXP[255 - _GF_LOG[num]] for num in range(1, 256)])
 
 def divide_terms(coefficient1, power1, coefficient2, power2):
     """
@@ -22,7 +75,7 @@ def divide_terms(coefficient1, power1, coefficient2, power2):
     term.
     """
     # From recipe: (a*x^b) / (c*x^d) = (a/c) * x^(b-d)
-    new_coeff = z256.div(coefficient1, coefficient2)
+    new_coeff = GF_MUL_TABLE[(coefficient1 << 8) | GF_INV_TABLE[coefficient2]]
     new_pow = power1 - power2
 
     # Represent our answer as a Polynomial
@@ -36,8 +89,9 @@ class Polynomial:
     field Z_256 (including numbers from 0 through 255).
 
     Since 256 is not prime, but is rather of the form p^n = 2^8, this
-    representation uses special arithmetic via the z256 module so as to
-    preserve multiplicative inverses (division) inside this field.
+    representation uses special arithmetic via the GF_MUL_TABLE and
+    GF_INV_TABLE lookup tables so as to preserve multiplicative inverses
+    (division) inside this field.
     """
 
     def __init__(self, terms=None):
@@ -88,13 +142,13 @@ class Polynomial:
         Check if another polynomial is equvalent
 
         inputs:
-            - other_polynomial: a Polynomial object
+            - other_polynomial: a Polynomial or DensePolynomial object
 
         Returns a boolean: True if other_polynomial contains
         the same terms as self, False otherwise.
         """
         # Make sure that other_polynomial is a Polynomial
-        if not isinstance(other_polynomial, Polynomial):
+        if not isinstance(other_polynomial, (Polynomial, DensePolynomial)):
             return False
 
         # Get the terms of the other_polynomial
@@ -188,7 +242,7 @@ class Polynomial:
         #Add the new coefficient to the old coefficient in Z256 
         #and updating the resulting polynomial
         old_coeff = self.get_coefficient(power)
-        new_coeff = z256.add(old_coeff,coefficient)
+        new_coeff = old_coeff ^ coefficient
         result[power] = new_coeff
          
         return Polynomial(result)
@@ -218,17 +272,13 @@ class Polynomial:
         Returns: a new Polynomial that is the product of multiplying
         this polynomial by (coefficient) * x^(power).
         """
-        result = Polynomial()
-        
         #Multiply the polynomial by one term by multiplying the coefficients in Z256
-        #and adding the powers, then updating the resulting polynomial
-        for old_pow in self.get_terms():
-            old_coeff = self.get_coefficient(old_pow)
-            new_coeff = z256.mul(old_coeff, coefficient)
-            new_pow = old_pow + power
-            result = result.add_term(new_coeff, new_pow)
-        
-        return result
+        #with one row of the multiplication table and adding the powers
+        mul_row = coefficient << 8
+        mul_table = GF_MUL_TABLE
+        terms = {old_pow + power: mul_table[mul_row | old_coeff]
+                 for old_pow, old_coeff in self._terms.items()}
+        return Polynomial(terms)
 
 
     def add_polynomial(self, other_polynomial):
@@ -318,6 +368,309 @@ class Polynomial:
         return curr
         
 
+def _check_power(power):
+    """
+    Raises ValueError if power cannot be stored in a DensePolynomial.
+    """
+    if power < 0:
+        raise ValueError("DensePolynomial does not support negative powers")
+
+class DensePolynomial:
+    """
+    A compact polynomial in the finite field Z_256, stored as a bytearray
+    of coefficients indexed by power.
+
+    Supports the same operations as Polynomial, but uses one byte per
+    coefficient and the log/antilog tables for arithmetic.  Only
+    non-negative powers can be represented.
+    """
+
+    __slots__ = ('_coeffs',)
+
+    def __init__(self, coefficients=None):
+        """
+        Creates a new DensePolynomial object.  If a sequence of
+        coefficients is provided, coefficients[i] is the coefficient of
+        x^i, otherwise the polynomial will be the 0 polynomial.
+
+        inputs:
+            - coefficients: a sequence of Z_256 numbers indexed by power or None
+        """
+        if coefficients is None:
+            self._coeffs = bytearray()
+        else:
+            self._coeffs = bytearray(coefficients)
+            self._trim()
+
+    def _trim(self):
+        """
+        Removes zero coefficients above the highest nonzero term so that
+        equal polynomials always have equal coefficient arrays.
+        """
+        coeffs = self._coeffs
+        while coeffs and coeffs[-1] == 0:
+            coeffs.pop()
+
+    @classmethod
+    def from_polynomial(cls, polynomial):
+        """
+        Converts a (sparse) Polynomial into a DensePolynomial.
+
+        inputs:
+            - polynomial: a Polynomial object with no negative powers
+
+        Returns: a new DensePolynomial with the same terms.
+        """
+        terms = polynomial.get_terms()
+        for power in terms:
+            _check_power(power)
+        coeffs = bytearray(max(terms, default=-1) + 1)
+        for power, coefficient in terms.items():
+            coeffs[power] = coefficient
+        return cls(coeffs)
+
+    def to_polynomial(self):
+        """
+        Returns: a new (sparse) Polynomial with the same nonzero terms.
+        """
+        return Polynomial(self.get_terms())
+
+    def __str__(self):
+        """
+        Returns: a string representation of the polynomial, containing the
+        class name and all of the terms.
+        """
+        term_strings = []
+        for power in range(len(self._coeffs) - 1, -1, -1):
+            coefficient = self._coeffs[power]
+            if coefficient != 0:
+                if power == 0:
+                    term_strings.append("%d" % coefficient)
+                else:
+                    term_strings.append("%d*x^%d" % (coefficient, power))
+
+        terms_str = " + ".join(term_strings)
+        if terms_str == "":
+            terms_str = "0"
+        return "DensePolynomial: %s" % terms_str
+
+    def __eq__(self, other_polynomial):
+        """
+        Check if another polynomial is equvalent
+
+        inputs:
+            - other_polynomial: a DensePolynomial or Polynomial object
+
+        Returns a boolean: True if other_polynomial contains
+        the same terms as self, False otherwise.
+        """
+        if isinstance(other_polynomial, Polynomial):
+            #Compare terms, as Polynomial does
+            return other_polynomial.__eq__(self)
+        if not isinstance(other_polynomial, DensePolynomial):
+            return False
+        return self._coeffs == other_polynomial._coeffs
+
+    def __ne__(self, other_polynomial):
+        """
+        Check if another polynomial is NOT equivalent
+
+        inputs:
+            - other_polynomial: a DensePolynomial object
+
+        Return a boolean: False if other_polynomial contains the same terms
+        as self, True otherwise.
+        """
+        return not self.__eq__(other_polynomial)
+
+    def get_coefficients(self):
+        """
+        Returns: a new bytearray of coefficients indexed by power.
+        """
+        return bytearray(self._coeffs)
+
+    def get_terms(self):
+        """
+        Returns: a new dictionary mapping the powers of the nonzero terms
+        to their coefficients.
+        """
+        return {power: coefficient
+                for power, coefficient in enumerate(self._coeffs)
+                if coefficient != 0}
+
+    def get_degree(self):
+        """
+        Returns: the maximum power over all nonzero terms in this
+        polynomial, or 0 for the 0 polynomial.
+        """
+        return max(len(self._coeffs) - 1, 0)
+
+    def get_coefficient(self, power):
+        """
+        Determines the coefficient of x^(power) in this polynomial.
+
+        inputs:
+            - power: an integer representing a polynomial power
+
+        Returns: a Z_256 number that is the coefficient or 0 if there
+                 is no term of the given power
+        """
+        if 0 <= power < len(self._coeffs):
+            return self._coeffs[power]
+        return 0
+
+    def add_term(self, coefficient, power):
+        """
+        Add one term to this polynomial.
+
+        inputs:
+            - coefficient: a Z_256 number representing the coefficient of the term
+            - power: a non-negative integer representing the power of the term
+
+        Returns: a new DensePolynomial that is the sum of this polynomial
+        and (coefficient) * x^(power).
+        """
+        _check_power(power)
+        coeffs = bytearray(self._coeffs)
+        if power >= len(coeffs):
+            coeffs.extend(bytes(power + 1 - len(coeffs)))
+        coeffs[power] ^= coefficient
+        return DensePolynomial(coeffs)
+
+    def subtract_term(self, coefficient, power):
+        """
+        Subtract one term from this polynomial.
+
+        inputs:
+            - coefficient: a Z_256 number representing the coefficient of the term
+            - power: a non-negative integer representing the power of the term
+
+        Returns: a new DensePolynomial that is the difference of this
+        polynomial and (coefficient) * x^(power).
+        """
+        return self.add_term(coefficient, power)
+
+    def multiply_by_term(self, coefficient, power):
+        """
+        Multiply this polynomial by one term.
+
+        inputs:
+            - coefficient: a Z_256 number representing the coefficient of the term
+            - power: a non-negative integer representing the power of the term
+
+        Returns: a new DensePolynomial that is the product of this
+        polynomial and (coefficient) * x^(power).
+        """
+        _check_power(power)
+        if coefficient == 0 or not self._coeffs:
+            return DensePolynomial()
+        exp_table = _GF_EXP
+        log_table = _GF_LOG
+        log_coeff = log_table[coefficient]
+        coeffs = bytearray(power + len(self._coeffs))
+        for pos, old_coeff in enumerate(self._coeffs):
+            if old_coeff != 0:
+                coeffs[pos + power] = exp_table[log_table[old_coeff] + log_coeff]
+        return DensePolynomial(coeffs)
+
+    def add_polynomial(self, other_polynomial):
+        """
+        Compute the sum of the current polynomial other_polynomial.
+
+        inputs:
+            - other_polynomial: a DensePolynomial or Polynomial object
+
+        Returns: a new DensePolynomial that is the sum of both polynomials.
+        """
+        other = _as_dense(other_polynomial)._coeffs
+        coeffs = bytearray(self._coeffs)
+        if len(other) > len(coeffs):
+            coeffs.extend(bytes(len(other) - len(coeffs)))
+        for power, coefficient in enumerate(other):
+            coeffs[power] ^= coefficient
+        return DensePolynomial(coeffs)
+
+    def subtract_polynomial(self, other_polynomial):
+        """
+        Compute the difference of the current polynomial and other_polynomial.
+
+        inputs:
+            - other_polynomial: a DensePolynomial or Polynomial object
+
+        Returns: a new DensePolynomial that is the difference of both
+        polynomials.
+        """
+        return self.add_polynomial(other_polynomial)
+
+    def multiply_by_polynomial(self, other_polynomial):
+        """
+        Compute the product of the current polynomial and other_polynomial.
+
+        inputs:
+            - other_polynomial: a DensePolynomial or Polynomial object
+
+        Returns: a new DensePolynomial that is the product of both
+        polynomials.
+        """
+        other = _as_dense(other_polynomial)._coeffs
+        if not self._coeffs or not other:
+            return DensePolynomial()
+        exp_table = _GF_EXP
+        log_table = _GF_LOG
+        other_terms = [(pos, log_table[coeff])
+                       for pos, coeff in enumerate(other) if coeff != 0]
+        coeffs = bytearray(len(self._coeffs) + len(other) - 1)
+        for pos1, coeff1 in enumerate(self._coeffs):
+            if coeff1 != 0:
+                log1 = log_table[coeff1]
+                for pos2, log2 in other_terms:
+                    coeffs[pos1 + pos2] ^= exp_table[log1 + log2]
+        return DensePolynomial(coeffs)
+
+    def remainder(self, denominator):
+        """
+        Compute a new DensePolynomial that is the remainder after dividing
+        this polynomial by denominator.
+
+        Note: does *not* return the quotient; only the remainder!
+
+        inputs:
+            - denominator: a nonzero DensePolynomial or Polynomial object
+
+        Returns: a new DensePolynomial that is the remainder
+        """
+        den = _as_dense(denominator)._coeffs
+        if not den:
+            raise ZeroDivisionError("remainder by the 0 polynomial")
+        exp_table = _GF_EXP
+        log_table = _GF_LOG
+        den_degree = len(den) - 1
+        log_lead = log_table[den[den_degree]]
+        den_terms = [(pos, log_table[coeff])
+                     for pos, coeff in enumerate(den[:den_degree]) if coeff != 0]
+
+        #Cancel the highest remaining term with a multiple of the
+        #denominator until the degree drops below the denominator's
+        coeffs = bytearray(self._coeffs)
+        for top in range(len(coeffs) - 1, den_degree - 1, -1):
+            coefficient = coeffs[top]
+            if coefficient != 0:
+                log_scale = (log_table[coefficient] - log_lead) % 255
+                shift = top - den_degree
+                coeffs[top] = 0
+                for pos, log_coeff in den_terms:
+                    coeffs[shift + pos] ^= exp_table[log_scale + log_coeff]
+        return DensePolynomial(coeffs[:den_degree])
+
+def _as_dense(polynomial):
+    """
+    Returns: polynomial itself if it is a DensePolynomial, otherwise
+    a DensePolynomial converted from the given Polynomial.
+    """
+    if isinstance(polynomial, DensePolynomial):
+        return polynomial
+    return DensePolynomial.from_polynomial(polynomial)
+
 def create_message_polynomial(message, num_correction_bytes):
     """
     Creates the appropriate Polynomial to represent the
@@ -356,20 +709,131 @@ def create_generator_polynomial(num_correction_bytes):
 
     Returns: generator Polynomial for generating Reed-Solomon encoding data.
     """
-    gen_poly = Polynomial()
-    
-    #Create generator polynomial by multiplying gen_poly by the polynomial
-    # (x-2^i) for all i in the set {0, 1, ..., num_correction_bytes - 1}
+    if num_correction_bytes <= 0:
+        return Polynomial()
+
+    #Build the Polynomial from the cached coefficients, highest power first
+    coeffs = generator_coefficients(num_correction_bytes)
+    return Polynomial({num_correction_bytes - idx: coeff
+                       for idx, coeff in enumerate(coeffs)})
+
+# Number of error correction bytes per block used by the standard QR
+# versions 1-40 at every error correction level.
+QR_ECC_SIZES = (7, 10, 13, 15, 16, 17, 18, 20, 22, 24, 26, 28, 30)
+
+# Generator coefficients and their shift-register form, keyed by the
+# number of error correction bytes.
+_GENERATOR_CACHE = {}
+_GENERATOR_LOG_TERMS = {}
+
+def _compute_generator_coefficients(num_correction_bytes):
+    """
+    Computes the coefficients of the generator polynomial, the product
+    of (x-2^i) for all i in the set {0, 1, ..., num_correction_bytes - 1},
+    using the log/antilog tables.
+
+    Inputs:
+        - num_correction_bytes: desired number of error correction bytes.
+
+    Returns: a tuple of num_correction_bytes + 1 Z_256 numbers, ordered
+    from the highest power (always 1) down to the constant term.
+    """
+    coeffs = [1]
     for idx in range(num_correction_bytes):
-        poly = Polynomial()
-        poly = poly.add_term(1,1)
-        poly = poly.add_term(z256.power(2,idx),0)
-        if gen_poly == Polynomial():
-            gen_poly = poly
-        else:
-            gen_poly = gen_poly.multiply_by_polynomial(poly)
-    
-    return gen_poly
+        log_root = idx % 255
+        product = coeffs + [0]
+        #Multiplying by (x-2^i) shifts every coefficient up one power
+        #and adds coefficient*2^i to the next lower power
+        for pos, coeff in enumerate(coeffs):
+            if coeff != 0:
+                product[pos + 1] ^= _GF_EXP[_GF_LOG[coeff] + log_root]
+        coeffs = product
+    return tuple(coeffs)
+
+def generator_coefficients(num_correction_bytes):
+    """
+    Returns the coefficients of the generator polynomial for the given
+    number of error correction bytes, computing them only on first use.
+
+    Inputs:
+        - num_correction_bytes: desired number of error correction bytes.
+
+    Returns: an immutable tuple of num_correction_bytes + 1 Z_256 numbers,
+    ordered from the highest power (always 1) down to the constant term.
+    """
+    coeffs = _GENERATOR_CACHE.get(num_correction_bytes)
+    if coeffs is None:
+        coeffs = _compute_generator_coefficients(num_correction_bytes)
+        _GENERATOR_CACHE[num_correction_bytes] = coeffs
+    return coeffs
+
+def _generator_log_terms(num_correction_bytes):
+    """
+    Returns the generator in the form used by the shift register: the
+    (position, log of coefficient) pairs of the nonzero coefficients
+    below the leading 1.
+
+    Inputs:
+        - num_correction_bytes: desired number of error correction bytes.
+
+    Returns: a tuple of (integer, integer) pairs.
+    """
+    terms = _GENERATOR_LOG_TERMS.get(num_correction_bytes)
+    if terms is None:
+        coeffs = generator_coefficients(num_correction_bytes)
+        terms = tuple((pos, _GF_LOG[coeff]) for pos, coeff
+                      in enumerate(coeffs[1:]) if coeff != 0)
+        _GENERATOR_LOG_TERMS[num_correction_bytes] = terms
+    return terms
+
+def warm_generator_cache(sizes=QR_ECC_SIZES):
+    """
+    Precomputes the generator polynomials for the given numbers of error
+    correction bytes, so that later encoding never pays for building them.
+
+    Inputs:
+        - sizes: an iterable of integers; defaults to every error
+                 correction block size used by standard QR codes.
+    """
+    for num_correction_bytes in sizes:
+        _generator_log_terms(num_correction_bytes)
+
+def reed_solomon_bytes(encoded_data, num_correction_bytes):
+    """
+    Computes the Reed-Solomon error correction bytes for the input data
+    without building any Polynomial objects.
+
+    The remainder of the message polynomial divided by the generator
+    polynomial is computed with a shift register: each message byte is
+    fed in from the highest power down, and the generator, scaled by the
+    byte leaving the register, is XORed into the remaining bytes.
+
+    Inputs:
+        - encoded_data: a list of integers (each between 0-255)
+                        representing an encoded QR message.
+        - num_correction_bytes: desired number of error correction bytes.
+
+    Returns: a list of num_correction_bytes integers (each between 0-255),
+    the coefficients of the remainder from the highest power
+    (num_correction_bytes - 1) down to the constant term.
+    """
+    if num_correction_bytes <= 0:
+        return []
+
+    exp_table = _GF_EXP
+    log_table = _GF_LOG
+    gen_terms = _generator_log_terms(num_correction_bytes)
+
+    register = bytearray(num_correction_bytes)
+    for byte in encoded_data:
+        factor = byte ^ register[0]
+        del register[0]
+        register.append(0)
+        if factor != 0:
+            log_factor = log_table[factor]
+            for pos, log_coeff in gen_terms:
+                register[pos] ^= exp_table[log_factor + log_coeff]
+    return list(register)
 
 def reed_solomon_correction(encoded_data, num_correction_bytes):
     """
@@ -383,18 +847,321 @@ def reed_solomon_correction(encoded_data, num_correction_bytes):
     Returns: a polynomial that represents the Reed-Solomon error
     correction code for the input data.
     """
-    msg = create_message_polynomial(encoded_data, num_correction_bytes)
-    gen = create_generator_polynomial(num_correction_bytes)
-    return msg.remainder(gen)
+    ecc = reed_solomon_bytes(encoded_data, num_correction_bytes)
+    top_power = num_correction_bytes - 1
+    return Polynomial({top_power - idx: coeff for idx, coeff in enumerate(ecc)})
+
+
+def _encode_chunk(chunk):
+    """
+    Computes the error correction bytes for a chunk of messages.  This
+    runs in the worker processes of reed_solomon_batch.
+
+    Inputs:
+        - chunk: a list of (message bytes, number of correction bytes) pairs
 
+    Returns: a list of lists of error correction bytes, in chunk order.
+    """
+    return [reed_solomon_bytes(data, num_correction_bytes)
+            for data, num_correction_bytes in chunk]
 
-# Uncomment the following line when you are ready to generate an
-# actual QR code.  To do so, you must enter a short message in the
-# "info" text box and hit return (be sure to hit return!).  You then
-# must push the "Generate!" button.  This will generate a QR code for
-# you to view - try scanning it with your phone!  If you would like to
-# save your QR codes, you can use the "Image in a New Window" button
-# to create a .png file that you can save by right clicking in your
-# browser window.
+def _pair_with_sizes(messages, sizes):
+    """
+    Pairs each message with its number of correction bytes, raising
+    ValueError if there are not as many sizes as messages.
+    """
+    sizes = iter(sizes)
+    missing = object()
+    for data in messages:
+        size = next(sizes, missing)
+        if size is missing:
+            raise ValueError("fewer correction sizes than messages")
+        yield data, size
+    if next(sizes, missing) is not missing:
+        raise ValueError("more correction sizes than messages")
+
+def reed_solomon_batch(messages, num_correction_bytes, workers=None,
+                       chunksize=256):
+    """
+    Computes the Reed-Solomon error correction bytes for many messages,
+    yielding the results in the same order as the messages.
+
+    Messages are consumed lazily, so the input may be a generator.  If
+    workers is given, messages are grouped into chunks that are encoded
+    by a pool of worker processes; only a few chunks per worker are in
+    flight at any time.
+
+    Inputs:
+        - messages: an iterable of lists of integers (each between 0-255)
+        - num_correction_bytes: an integer used for every message, or an
+          iterable with one integer per message (for QR versions whose
+          blocks use different sizes)
+        - workers: the number of worker processes, or None to encode
+          in this process
+        - chunksize: the number of messages sent to a worker at a time
+
+    Returns: a generator of lists of error correction bytes, as computed
+    by reed_solomon_bytes.
+    """
+    if isinstance(num_correction_bytes, numbers.Integral):
+        jobs = zip(messages, itertools.repeat(int(num_correction_bytes)))
+    else:
+        jobs = _pair_with_sizes(messages, num_correction_bytes)
+
+    if not workers:
+        for data, size in jobs:
+            yield reed_solomon_bytes(data, size)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    warm_generator_cache()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        while True:
+            chunk = [(bytes(data), size)
+                     for data, size in itertools.islice(jobs, chunksize)]
+            if not chunk:
+                break
+            pending.append(executor.submit(_encode_chunk, chunk))
+            #Bound the number of outstanding chunks, so results stream
+            #back while the input is still being read
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+# Products of every Z_256 number with the generator coefficients below
+# the leading 1, keyed by the number of error correction bytes.
+_GENERATOR_PRODUCT_TABLES = {}
+
+def _generator_product_table(num_correction_bytes):
+    """
+    Returns a (256, num_correction_bytes) numpy uint8 array whose row f
+    holds f times each generator coefficient below the leading 1.
+    """
+    table = _GENERATOR_PRODUCT_TABLES.get(num_correction_bytes)
+    if table is None:
+        import numpy
+        exp_table = numpy.frombuffer(_GF_EXP, dtype=numpy.uint8)
+        table = numpy.zeros((256, num_correction_bytes), dtype=numpy.uint8)
+        factor_logs = numpy.frombuffer(_GF_LOG, dtype=numpy.uint8)[1:].astype(numpy.intp)
+        for pos, log_coeff in _generator_log_terms(num_correction_bytes):
+            table[1:, pos] = exp_table[factor_logs + log_coeff]
+        _GENERATOR_PRODUCT_TABLES[num_correction_bytes] = table
+    return table
+
+def reed_solomon_matrix(messages, num_correction_bytes):
+    """
+    Computes the Reed-Solomon error correction bytes for many messages of
+    the same length at once.  Requires numpy.
+
+    All messages are fed through the shift register of reed_solomon_bytes
+    in lock-step, one message column per step, so the Python-level work
+    depends only on the message length.
+
+    Inputs:
+        - messages: an (N, n) array-like of integers (each between 0-255),
+                    one message per row
+        - num_correction_bytes: desired number of error correction bytes.
+
+    Returns: an (N, num_correction_bytes) numpy uint8 array whose row i is
+    reed_solomon_bytes(messages[i], num_correction_bytes).
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("reed_solomon_matrix requires numpy") from None
+
+    messages = numpy.asarray(messages, dtype=numpy.uint8)
+    if messages.ndim != 2:
+        raise ValueError("messages must be a two-dimensional array")
+    num_messages, num_bytes = messages.shape
+    register = numpy.zeros((num_messages, num_correction_bytes), dtype=numpy.uint8)
+    if num_correction_bytes <= 0:
+        return register
+
+    table = _generator_product_table(num_correction_bytes)
+    shifted = numpy.empty_like(register)
+    for col in range(num_bytes):
+        factor = messages[:, col] ^ register[:, 0]
+        #Shift every register left by one byte, then add in the scaled
+        #generator for each message
+        shifted[:, :-1] = register[:, 1:]
+        shifted[:, -1] = 0
+        numpy.bitwise_xor(shifted, table[factor], out=shifted)
+        register, shifted = shifted, register
+    return register
+
+
+def _gf_mul(num1, num2):
+    """
+    Returns: the Z_256 product of num1 and num2.
+    """
+    return GF_MUL_TABLE[(num1 << 8) | num2]
+
+def _gf_div(num1, num2):
+    """
+    Returns: the Z_256 quotient of num1 divided by the nonzero num2.
+    """
+    return GF_MUL_TABLE[(num1 << 8) | GF_INV_TABLE[num2]]
+
+def _evaluate_low_first(coeffs, value):
+    """
+    Evaluates a polynomial whose coefficients are ordered from the
+    constant term up to the highest power.
+
+    Returns: the Z_256 value of the polynomial at value.
+    """
+    result = 0
+    for coeff in reversed(coeffs):
+        result = _gf_mul(result, value) ^ coeff
+    return result
+
+def reed_solomon_syndromes(codeword, num_correction_bytes):
+    """
+    Computes the syndromes of a received codeword: the codeword
+    polynomial evaluated at each root 2^i of the generator polynomial.
+
+    Inputs:
+        - codeword: a list of integers (each between 0-255), the message
+                    bytes followed by the error correction bytes
+        - num_correction_bytes: the number of error correction bytes.
+
+    Returns: a list of num_correction_bytes Z_256 numbers, which are all
+    0 exactly when the codeword has no detectable errors.
+    """
+    exp_table = _GF_EXP
+    log_table = _GF_LOG
+    syndromes = []
+    for idx in range(num_correction_bytes):
+        log_root = idx % 255
+        #Horner's rule, with the highest power first
+        value = 0
+        for byte in codeword:
+            if value != 0:
+                value = exp_table[log_table[value] + log_root]
+            value ^= byte
+        syndromes.append(value)
+    return syndromes
+
+def _error_locator(syndromes):
+    """
+    Finds the error locator polynomial with the Berlekamp-Massey
+    algorithm.
+
+    Inputs:
+        - syndromes: a list of Z_256 numbers from reed_solomon_syndromes
+
+    Returns: a list of Z_256 coefficients of the error locator, ordered
+    from the constant term (always 1) up to the highest power.
+    """
+    locator = [1]
+    previous = [1]
+    previous_discrepancy = 1
+    num_errors = 0
+    shift = 1
+    for step, syndrome in enumerate(syndromes):
+        discrepancy = syndrome
+        for idx in range(1, num_errors + 1):
+            discrepancy ^= _gf_mul(locator[idx], syndromes[step - idx])
+        if discrepancy == 0:
+            shift += 1
+            continue
+
+        #locator - (discrepancy / previous_discrepancy) * x^shift * previous
+        scale = _gf_div(discrepancy, previous_discrepancy)
+        updated = locator + [0] * max(0, len(previous) + shift - len(locator))
+        for idx, coeff in enumerate(previous):
+            updated[idx + shift] ^= _gf_mul(scale, coeff)
+
+        if 2 * num_errors <= step:
+            previous = locator
+            previous_discrepancy = discrepancy
+            num_errors = step + 1 - num_errors
+            shift = 1
+        else:
+            shift += 1
+        locator = updated
+
+    return locator[:num_errors + 1]
+
+def reed_solomon_decode(codeword, num_correction_bytes):
+    """
+    Checks a received codeword and corrects up to num_correction_bytes / 2
+    erroneous bytes.
+
+    Errors are located with Berlekamp-Massey and a Chien search over the
+    codeword positions, and their values are found with Forney's
+    formula.  A codeword whose syndromes are all 0 is returned as is.
+
+    Inputs:
+        - codeword: a list of integers (each between 0-255), the message
+                    bytes followed by the error correction bytes
+        - num_correction_bytes: the number of error correction bytes.
+
+    Returns: a new list with the corrected codeword.  Raises ValueError
+    if the codeword has more errors than can be corrected.
+    """
+    corrected = list(codeword)
+    syndromes = reed_solomon_syndromes(corrected, num_correction_bytes)
+    if not any(syndromes):
+        return corrected
+
+    locator = _error_locator(syndromes)
+    num_errors = len(locator) - 1
+    if 2 * num_errors > num_correction_bytes:
+        raise ValueError("too many errors to correct")
+
+    #Chien search: the byte at index i has power p = len - 1 - i, and is
+    #in error when the locator has a root at 2^(-p)
+    length = len(corrected)
+    error_powers = []
+    for power in range(length):
+        if _evaluate_low_first(locator, _GF_EXP[(255 - power) % 255]) == 0:
+            error_powers.append(power)
+    if len(error_powers) != num_errors:
+        raise ValueError("too many errors to correct")
+
+    #Forney: the error evaluator is syndromes * locator mod x^k, and
+    #the error value at X = 2^p is X * evaluator(X^-1) / locator'(X^-1)
+    evaluator = [0] * num_correction_bytes
+    for idx1, syndrome in enumerate(syndromes):
+        for idx2, coeff in enumerate(locator):
+            if idx1 + idx2 < num_correction_bytes:
+                evaluator[idx1 + idx2] ^= _gf_mul(syndrome, coeff)
+    derivative = [coeff if idx % 2 == 0 else 0
+                  for idx, coeff in enumerate(locator[1:])]
+    for power in error_powers:
+        x_inverse = _GF_EXP[(255 - power) % 255]
+        denominator = _evaluate_low_first(derivative, x_inverse)
+        if denominator == 0:
+            raise ValueError("too many errors to correct")
+        magnitude = _gf_mul(_GF_EXP[power % 255],
+                            _gf_div(_evaluate_low_first(evaluator, x_inverse),
+                                    denominator))
+        corrected[length - 1 - power] ^= magnitude
+
+    if any(reed_solomon_syndromes(corrected, num_correction_bytes)):
+        raise ValueError("too many errors to correct")
+    return corrected
+
+
+def run():
+    """
+    Start the QR code generator GUI.
+
+    To generate an actual QR code, you must enter a short message in the
+    "info" text box and hit return (be sure to hit return!).  You then
+    must push the "Generate!" button.  This will generate a QR code for
+    you to view - try scanning it with your phone!  If you would like to
+    save your QR codes, you can use the "Image in a New Window" button
+    to create a .png file that you can save by right clicking in your
+    browser window.
+    """
+    import comp140_module5 as qrcode
+    qrcode.start(reed_solomon_correction)
 
-qrcode.start(reed_solomon_correction)
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,310 @@
+"""
+Benchmarks for the QR code polynomial arithmetic and Reed-Solomon encoding.
+
+Sweeps every QR version (1-40) and error correction level (L, M, Q, H),
+times create_message_polynomial, create_generator_polynomial,
+Polynomial.remainder and reed_solomon_correction on a block of that
+version's size, and saves the results as JSON.  A previous results file
+can be passed with --compare to report regressions.
+
+Usage:
+    python qrcode_benchmark.py --output results.json
+    python qrcode_benchmark.py --versions 1-10 --compare results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+import qrcode
+
+LEVELS = ("L", "M", "Q", "H")
+
+# Error correction bytes per block and number of blocks, indexed by
+# level and then by version (index 0 is unused).
+ECC_CODEWORDS_PER_BLOCK = {
+    "L": (None, 7, 10, 15, 20, 26, 18, 20, 24, 30, 18, 20, 24, 26, 30, 22,
+          24, 28, 30, 28, 28, 28, 28, 30, 30, 26, 28, 30, 30, 30, 30, 30,
+          30, 30, 30, 30, 30, 30, 30, 30, 30),
+    "M": (None, 10, 16, 26, 18, 24, 16, 18, 22, 22, 26, 30, 22, 22, 24, 24,
+          28, 28, 26, 26, 26, 26, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28,
+          28, 28, 28, 28, 28, 28, 28, 28, 28),
+    "Q": (None, 13, 22, 18, 26, 18, 24, 18, 22, 20, 24, 28, 26, 24, 20, 30,
+          24, 28, 28, 26, 30, 28, 30, 30, 30, 30, 28, 30, 30, 30, 30, 30,
+          30, 30, 30, 30, 30, 30, 30, 30, 30),
+    "H": (None, 17, 28, 22, 16, 22, 28, 26, 26, 24, 28, 24, 28, 22, 24, 24,
+          30, 28, 28, 26, 28, 30, 24, 30, 30, 30, 30, 30, 30, 30, 30, 30,
+          30, 30, 30, 30, 30, 30, 30, 30, 30),
+}
+NUM_ERROR_CORRECTION_BLOCKS = {
+    "L": (None, 1, 1, 1, 1, 1, 2, 2, 2, 2, 4, 4, 4, 4, 4, 6, 6, 6, 6, 7, 8,
+          8, 9, 9, 10, 12, 12, 12, 13, 14, 15, 16, 17, 18, 19, 19, 20, 21,
+          22, 24, 25),
+    "M": (None, 1, 1, 1, 2, 2, 4, 4, 4, 5, 5, 5, 8, 9, 9, 10, 10, 11, 13,
+          14, 16, 17, 17, 18, 20, 21, 23, 25, 26, 28, 29, 31, 33, 35, 37,
+          38, 40, 43, 45, 47, 49),
+    "Q": (None, 1, 1, 2, 2, 4, 4, 6, 6, 8, 8, 8, 10, 12, 16, 12, 17, 16, 18,
+          21, 20, 23, 23, 25, 27, 29, 34, 34, 35, 38, 40, 43, 45, 48, 51,
+          53, 56, 59, 62, 65, 68),
+    "H": (None, 1, 1, 2, 4, 4, 4, 5, 6, 8, 8, 11, 11, 16, 16, 18, 16, 19,
+          21, 25, 25, 25, 34, 30, 32, 35, 37, 40, 42, 45, 48, 51, 54, 57,
+          60, 63, 66, 70, 74, 77, 81),
+}
+
+def num_codewords(version):
+    """
+    Computes the total number of codewords (data and error correction)
+    that fit in a QR code of the given version.
+
+    input:
+        - version: an integer between 1 and 40
+
+    returns: an integer number of 8-bit codewords
+    """
+    modules = (16 * version + 128) * version + 64
+    if version >= 2:
+        num_align = version // 7 + 2
+        modules -= (25 * num_align - 10) * num_align - 55
+        if version >= 7:
+            modules -= 36
+    return modules // 8
+
+def block_sizes(version, level):
+    """
+    Computes the sizes of the blocks a QR code is split into before
+    Reed-Solomon encoding.
+
+    inputs:
+        - version: an integer between 1 and 40
+        - level: one of "L", "M", "Q" or "H"
+
+    returns: a list of (data bytes, error correction bytes) pairs, one
+    per block
+    """
+    num_blocks = NUM_ERROR_CORRECTION_BLOCKS[level][version]
+    ecc_len = ECC_CODEWORDS_PER_BLOCK[level][version]
+    total = num_codewords(version)
+    short_len = total // num_blocks
+    num_short = num_blocks - total % num_blocks
+    blocks = []
+    for idx in range(num_blocks):
+        block_len = short_len if idx < num_short else short_len + 1
+        blocks.append((block_len - ecc_len, ecc_len))
+    return blocks
+
+def measure(func, min_time):
+    """
+    Times func and measures the memory used by one call.
+
+    inputs:
+        - func: a function of no arguments
+        - min_time: the minimum number of seconds to spend timing
+
+    returns: a dictionary with the calls per second (best of 3 runs),
+    the number of memory blocks the call left allocated (its result and
+    anything it cached; temporaries freed before it returned are not
+    counted) and the peak number of bytes allocated during the call
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time / 3 or number >= 1 << 20:
+            break
+        number *= 2
+    best = min([elapsed] + timer.repeat(repeat=2, number=number))
+
+    #Leave a trace started by the caller running, with its peak intact
+    tracing = not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        base, peak_before = tracemalloc.get_traced_memory()
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if tracing:
+            tracemalloc.stop()
+    del result
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename")
+                 if stat.count_diff > 0)
+    if not tracing and peak <= peak_before:
+        #The call stayed below the caller's earlier peak, so only what it
+        #left allocated is known
+        peak = current
+
+    return {"ops_per_sec": number / best if best > 0 else float("inf"),
+            "retained_blocks": blocks,
+            "peak_bytes": max(peak - base, 0)}
+
+def benchmark_block(data_len, ecc_len, rng, min_time):
+    """
+    Benchmarks the encoding steps for one block size.
+
+    inputs:
+        - data_len: the number of data bytes in the block
+        - ecc_len: the number of error correction bytes
+        - rng: a random.Random used to generate the message
+        - min_time: the minimum number of seconds to time each function
+
+    returns: a dictionary mapping each benchmarked function name to the
+    result of measure
+    """
+    message = [rng.randrange(256) for _ in range(data_len)]
+    msg_poly = qrcode.create_message_polynomial(message, ecc_len)
+    gen_poly = qrcode.create_generator_polynomial(ecc_len)
+    return {
+        "create_message_polynomial": measure(
+            lambda: qrcode.create_message_polynomial(message, ecc_len), min_time),
+        "create_generator_polynomial": measure(
+            lambda: qrcode.create_generator_polynomial(ecc_len), min_time),
+        "Polynomial.remainder": measure(
+            lambda: msg_poly.remainder(gen_poly), min_time),
+        "reed_solomon_correction": measure(
+            lambda: qrcode.reed_solomon_correction(message, ecc_len), min_time),
+    }
+
+def git_revision():
+    """
+    Returns: the current git commit hash, or None outside a git checkout.
+    """
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+def run_benchmarks(versions, levels, seed=140, min_time=0.2):
+    """
+    Benchmarks the largest block of every requested version and level.
+    Block sizes shared by several versions are only measured once.
+
+    inputs:
+        - versions: an iterable of integers between 1 and 40
+        - levels: an iterable of error correction levels
+        - seed: the seed for the random messages
+        - min_time: the minimum number of seconds to time each function
+
+    returns: a JSON-serializable dictionary of the results
+    """
+    measured = {}
+    cases = []
+    for version in versions:
+        for level in levels:
+            data_len, ecc_len = block_sizes(version, level)[-1]
+            key = (data_len, ecc_len)
+            if key not in measured:
+                rng = random.Random("%d-%d-%d" % (seed, data_len, ecc_len))
+                measured[key] = benchmark_block(data_len, ecc_len, rng, min_time)
+            cases.append({"version": version, "level": level,
+                          "data_bytes": data_len, "ecc_bytes": ecc_len,
+                          "results": measured[key]})
+    return {"metadata": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                         "python": platform.python_version(),
+                         "platform": platform.platform(),
+                         "revision": git_revision(),
+                         "seed": seed},
+            "cases": cases}
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares two sets of benchmark results.
+
+    inputs:
+        - baseline: a dictionary returned by run_benchmarks
+        - current: a dictionary returned by run_benchmarks
+        - threshold: the relative slowdown in ops/sec that counts as a
+          regression
+
+    returns: a list of (version, level, function, ratio) tuples for every
+    measurement whose ops/sec fell by more than threshold, where ratio is
+    current ops/sec divided by baseline ops/sec
+    """
+    old = {(case["version"], case["level"]): case["results"]
+           for case in baseline["cases"]}
+    regressions = []
+    for case in current["cases"]:
+        key = (case["version"], case["level"])
+        if key not in old:
+            continue
+        for name, stats in case["results"].items():
+            if name not in old[key]:
+                continue
+            ratio = stats["ops_per_sec"] / old[key][name]["ops_per_sec"]
+            if ratio < 1 - threshold:
+                regressions.append((key[0], key[1], name, ratio))
+    return regressions
+
+def parse_versions(text):
+    """
+    Parses a version list such as "1-10,20,40".
+
+    returns: a sorted list of integers
+    """
+    versions = set()
+    for part in text.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            versions.update(range(int(first), int(last) + 1))
+        else:
+            versions.add(int(part))
+    if not versions or min(versions) < 1 or max(versions) > 40:
+        raise argparse.ArgumentTypeError("versions must be between 1 and 40")
+    return sorted(versions)
+
+def main(argv=None):
+    """
+    Runs the benchmarks from the command line.
+
+    returns: the process exit status, 1 if --compare found regressions
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--versions", type=parse_versions, default=list(range(1, 41)),
+                        help="QR versions to sweep, e.g. 1-10,40 (default: all)")
+    parser.add_argument("--levels", default="".join(LEVELS),
+                        help="error correction levels to sweep (default: LMQH)")
+    parser.add_argument("--seed", type=int, default=140)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds to spend timing each function")
+    parser.add_argument("--output", help="file to save the JSON results to")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    levels = [level for level in args.levels.upper() if level in LEVELS]
+    results = run_benchmarks(args.versions, levels, args.seed, args.min_time)
+
+    for case in results["cases"]:
+        print("version %2d-%s (%3d+%2d bytes): %s" % (
+            case["version"], case["level"], case["data_bytes"], case["ecc_bytes"],
+            ", ".join("%s %.0f/s" % (name, stats["ops_per_sec"])
+                      for name, stats in case["results"].items())))
+
+    if args.output:
+        with open(args.output, "w") as outfile:
+            json.dump(results, outfile, indent=2)
+
+    if args.compare:
+        with open(args.compare) as infile:
+            baseline = json.load(infile)
+        regressions = compare(baseline, results, args.threshold)
+        for version, level, name, ratio in regressions:
+            print("REGRESSION version %d-%s %s: %.2fx" % (version, level, name, ratio))
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
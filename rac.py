@@ -0,0 +1,163 @@
+"""
+Restricted access containers shared by the graph searches.
+
+Every container supports push, pop, clear and len, and both push and pop
+take constant time (logarithmic for the priority queue).
+"""
+
+import collections
+import heapq
+
+class Queue:
+    """
+    A simple implementation of a FIFO queue.
+    """
+
+    def __init__(self):
+        """
+        Initialize the queue.
+        """
+        self._queue = collections.deque()
+
+    def __len__(self):
+        """
+        Returns: an integer representing the number of items in the queue.
+        """
+        return len(self._queue)
+
+    def __str__(self):
+        """
+        Returns: a string representation of the queue.
+        """
+        return str(list(self._queue))
+
+    def push(self, item):
+        """
+        Add item to the queue.
+
+        input:
+            - item: any data type that's valid in a list
+        """
+        self._queue.append(item)
+
+    def pop(self):
+        """
+        Remove the least recently added item.
+
+        Assumes that there is at least one element in the queue.  It
+        is an error if there is not.  You do not need to check for
+        this condition.
+
+        Returns: the least recently added item.
+        """
+        return self._queue.popleft()
+
+    def clear(self):
+        """
+        Remove all items from the queue.
+        """
+        self._queue.clear()
+
+
+class Stack:
+    """
+    A simple implementation of a LIFO stack.
+    """
+
+    def __init__(self):
+        """
+        Initialize the stack.
+        """
+        self._stack = []
+
+    def __len__(self):
+        """
+        Returns: an integer representing the number of items in the stack.
+        """
+        return len(self._stack)
+
+    def __str__(self):
+        """
+        Returns: a string representation of the stack.
+        """
+        return str(self._stack)
+
+    def push(self, item):
+        """
+        Add item to the stack.
+
+        input:
+            - item: any data type that's valid in a list
+        """
+        self._stack.append(item)
+
+    def pop(self):
+        """
+        Remove the most recently added item.
+
+        Assumes that there is at least one element in the stack.  It
+        is an error if there is not.  You do not need to check for
+        this condition.
+
+        Returns: the most recently added item.
+        """
+        return self._stack.pop()
+
+    def clear(self):
+        """
+        Remove all items from the stack.
+        """
+        self._stack.clear()
+
+
+class PriorityQueue:
+    """
+    A simple implementation of a min-priority queue.
+
+    Items must be comparable with each other; push (priority, item)
+    tuples to order arbitrary items by priority.
+    """
+
+    def __init__(self):
+        """
+        Initialize the priority queue.
+        """
+        self._heap = []
+
+    def __len__(self):
+        """
+        Returns: an integer representing the number of items in the queue.
+        """
+        return len(self._heap)
+
+    def __str__(self):
+        """
+        Returns: a string representation of the queue, smallest item first.
+        """
+        return str(sorted(self._heap))
+
+    def push(self, item):
+        """
+        Add item to the priority queue.
+
+        input:
+            - item: any data type that can be compared with the other items
+        """
+        heapq.heappush(self._heap, item)
+
+    def pop(self):
+        """
+        Remove the smallest item.
+
+        Assumes that there is at least one element in the queue.  It
+        is an error if there is not.
+
+        Returns: the smallest item.
+        """
+        return heapq.heappop(self._heap)
+
+    def clear(self):
+        """
+        Remove all items from the priority queue.
+        """
+        self._heap.clear()
@@ -0,0 +1,104 @@
+"""
+Instrumentation for the searches in mapsearch.
+
+Pass a SearchStats object as the stats input of bfs_dfs, dfs or astar to
+count the work the search does:
+
+    stats = SearchStats(trace_memory=True)
+    parent = mapsearch.astar(graph, start, end, edge_distance,
+                             straight_line_distance, stats=stats)
+    print(stats.to_json())
+
+Searches called without stats do no bookkeeping at all.
+"""
+
+import contextlib
+import json
+import time
+import tracemalloc
+
+class SearchStats:
+    """
+    Counters and timings collected from one or more searches.
+    """
+
+    def __init__(self, trace_memory=False):
+        """
+        Creates a new SearchStats object with all counters at 0.
+
+        inputs:
+            - trace_memory: if True, measure the peak memory allocated
+              during each phase with tracemalloc (which slows the search);
+              phase_peak_bytes keeps the largest peak seen per phase
+        """
+        self.trace_memory = trace_memory
+        self.searches = 0
+        self.nodes_expanded = 0
+        self.edges_relaxed = 0
+        self.peak_frontier = 0
+        self.heuristic_calls = 0
+        self.phase_seconds = {}
+        self.phase_peak_bytes = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Times the statements in a with block and adds the time to the
+        named phase.
+
+        inputs:
+            - name: a string naming the phase
+        """
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            #A trace started by the caller keeps its own peak, so compare
+            #against it instead of resetting it
+            base, peak_before = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                if tracing or peak > peak_before:
+                    used = peak - base
+                else:
+                    #The phase stayed below the caller's earlier peak, so
+                    #only the memory still allocated at its end is known
+                    used = max(current - base, 0)
+                self.phase_peak_bytes[name] = max(self.phase_peak_bytes.get(name, 0), used)
+            if tracing:
+                tracemalloc.stop()
+
+    def frontier(self, size):
+        """
+        Records the current number of nodes waiting to be expanded.
+
+        inputs:
+            - size: an integer frontier size
+        """
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    def as_dict(self):
+        """
+        Returns: a dictionary of all counters and timings.
+        """
+        return {"searches": self.searches,
+                "nodes_expanded": self.nodes_expanded,
+                "edges_relaxed": self.edges_relaxed,
+                "peak_frontier": self.peak_frontier,
+                "heuristic_calls": self.heuristic_calls,
+                "phase_seconds": dict(self.phase_seconds),
+                "phase_peak_bytes": (dict(self.phase_peak_bytes)
+                                     if self.trace_memory else None)}
+
+    def to_json(self):
+        """
+        Returns: the counters and timings as a JSON string.
+        """
+        return json.dumps(self.as_dict(), sort_keys=True)
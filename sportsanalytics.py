@@ -2,11 +2,6 @@
 Sports Analytics
 """
 
-import numeric
-import codeskulptor
-from urllib import request
-import comp140_module6 as sports
-
 def read_matrix(filename):
     """
     Parse data from the file with the given filename into a matrix.
@@ -16,6 +11,9 @@ def read_matrix(filename):
 
     returns: a matrix containing the elements in the given file
     """
+    import codeskulptor
+    import numeric
+    from urllib import request
     url = codeskulptor.file2url(filename)
     netfile = request.urlopen(url)
     matrix = []
@@ -183,6 +181,8 @@ def run_experiment(iterations):
 
     Print out the model's prediction error on the two data sets
     """
+    import comp140_module6 as sports
+
     #Read the matrices from the training and testing data files
     train_stats = read_matrix("comp140_analytics_baseball.txt")
     train_wins = read_matrix("comp140_analytics_wins.txt")
@@ -219,4 +219,5 @@ def run_experiment(iterations):
     print("LASSO Estimation with lambda parameter = 100000: ",  
           lasso3.prediction_error(test_stats, test_wins))
 
-#run_experiment(10)
+if __name__ == "__main__":
+    run_experiment(10)
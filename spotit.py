@@ -3,8 +3,6 @@ Code to implement the game of Spot it!
 http://www.blueorangegames.com/spotit/
 """
 
-import comp140_module2 as spotit
-
 def equivalent(point1, point2, mod):
     """
     Determines if the two given points are equivalent in the projective
@@ -88,8 +86,6 @@ def generate_all_points(mod):
                     points.append(current)
     return points
 
-generate_all_points(3)
-
 
 def create_cards(points, lines, mod):
     """
@@ -136,9 +132,8 @@ def run():
     #           everything and you can play your game.  The GUI does
     #           not work if the modulus is larger than 7.
 
+    #import comp140_module2 as spotit
     #spotit.start(deck)
 
-# Uncomment the following line to run your game (once you have
-# implemented the run function.)
-
-run()
+if __name__ == "__main__":
+    run()
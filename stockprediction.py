@@ -2,7 +2,6 @@
 Stock market prediction using Markov chains.
 """
 
-import comp140_module3 as stocks
 import random
 
 ### Model
@@ -143,6 +142,8 @@ def run():
     You do not need to modify any code in this function.  You should
     feel free to look it over and understand it, though.
     """
+    import comp140_module3 as stocks
+
     # Get the supported stock symbols
     symbols = stocks.get_supported_symbols()
 
@@ -185,8 +186,5 @@ def run():
             print("Order", order, ":", error)
         print()
 
-# You might want to comment out the call to run while you are
-# developing your code.  Uncomment it when you are ready to run your
-# code on the provided data.
-
-run()
+if __name__ == "__main__":
+    run()